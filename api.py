@@ -0,0 +1,184 @@
+import hashlib
+import json
+from collections import OrderedDict
+from datetime import datetime
+from urllib.parse import parse_qsl
+
+from bradness import (
+    get_leaderboard,
+    get_member_breakdown,
+    get_member_category_points,
+    get_member_weekly_points,
+    get_week_key,
+    get_weekly_leaderboard,
+    list_leagues,
+    make_registry,
+    open_store,
+    sync_store,
+)
+
+# Read-only JSON API for dashboards and bots, beside the Streamlit app:
+#
+#     uvicorn api:app --host 0.0.0.0 --port 8502
+#
+#     GET /leagues
+#     GET /leagues/<league>/leaderboard[?week=YYYY-MM-DD]
+#     GET /leagues/<league>/members/<name>
+#
+# Responses carry an ETag from the league's data version, so a poll with
+# If-None-Match gets an empty 304 until someone saves.
+
+CHUNK_BYTES = 64 * 1024
+RESPONSE_CACHE_SIZE = 256
+
+registry = make_registry()
+responses = OrderedDict()
+
+
+class NotFound(Exception):
+    pass
+
+
+class BadRequest(Exception):
+    pass
+
+
+def get_store(slug):
+    # Leagues load on first request and stay loaded within the memory budget;
+    # sync_store picks up writes from the app or other processes.
+    loaded = registry["stores"].get(slug)
+    if loaded is None:
+        leagues = list_leagues()
+        if slug not in leagues:
+            raise NotFound(f"No league named '{slug}'")
+        league = leagues[slug]
+    else:
+        league = loaded["league"]
+    store = open_store(registry, league)
+    sync_store(store)
+    return store
+
+
+def data_etag(store):
+    # File stamps change with every write and match across processes reading the same files.
+    key = repr((store["league"]["slug"], store["stamp"])).encode()
+    return '"' + hashlib.blake2b(key, digest_size=8).hexdigest() + '"'
+
+
+def leaderboard_payload(store, query):
+    agg = store["aggregates"]
+    week_key = None
+    if "week" in query:
+        try:
+            week_key = get_week_key(datetime.strptime(query["week"], "%Y-%m-%d"))
+        except ValueError:
+            raise BadRequest(f"Unreadable week '{query['week']}'")
+    board = get_weekly_leaderboard(agg, week_key) if week_key else get_leaderboard(agg)
+    return {
+        "league": store["league"]["slug"],
+        "week": week_key,
+        "standings": [{"rank": rank, "member": name, "points": pts} for rank, (name, pts) in enumerate(board.items(), 1)],
+    }
+
+
+def member_payload(store, member):
+    agg = store["aggregates"]
+    if member not in agg["ids"]:
+        raise NotFound(f"No member named '{member}'")
+    counts = get_member_breakdown(agg, member)
+    points = get_member_category_points(agg, member)
+    return {
+        "league": store["league"]["slug"],
+        "member": member,
+        "points": agg["totals"][agg["ids"][member]],
+        "categories": [{"category": cat, "count": count, "points": points[cat]} for cat, count in counts.items()],
+        "weeks": get_member_weekly_points(agg, member),
+    }
+
+
+def route(path, query):
+    # Returns the store the response depends on and a function building its payload.
+    parts = [part for part in path.split("/") if part]
+    if parts == ["leagues"]:
+        return None, lambda: [{"league": slug, "name": league["name"]} for slug, league in list_leagues().items()]
+    if len(parts) == 3 and parts[0] == "leagues" and parts[2] == "leaderboard":
+        store = get_store(parts[1])
+        return store, lambda: leaderboard_payload(store, query)
+    if len(parts) == 4 and parts[0] == "leagues" and parts[2] == "members":
+        store = get_store(parts[1])
+        return store, lambda: member_payload(store, parts[3])
+    raise NotFound(f"No route for {path}")
+
+
+def cached_body(key, store, build):
+    # Bodies are kept per (path, query, data version), so repeat polls without
+    # If-None-Match skip scoring and serialization.
+    body = responses.get(key)
+    if body is None:
+        with store["lock"]:
+            body = json.dumps(build()).encode()
+        responses[key] = body
+        while len(responses) > RESPONSE_CACHE_SIZE:
+            responses.popitem(last=False)
+    else:
+        responses.move_to_end(key)
+    return body
+
+
+async def send_json(send, status, body, headers=(), head=False):
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            *headers,
+        ],
+    })
+    if head:
+        await send({"type": "http.response.body", "body": b""})
+        return
+    # Large boards go out in chunks rather than one buffer.
+    for start in range(0, max(len(body), 1), CHUNK_BYTES):
+        await send({"type": "http.response.body", "body": body[start:start + CHUNK_BYTES], "more_body": start + CHUNK_BYTES < len(body)})
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        await lifespan(receive, send)
+        return
+    if scope["type"] != "http":
+        return
+    if scope["method"] not in ("GET", "HEAD"):
+        await send_json(send, 405, json.dumps({"error": "Read only"}).encode(), [(b"allow", b"GET, HEAD")])
+        return
+    head = scope["method"] == "HEAD"
+    query = dict(parse_qsl(scope["query_string"].decode()))
+    try:
+        store, build = route(scope["path"], query)
+        if store is None:
+            await send_json(send, 200, json.dumps(build()).encode(), head=head)
+            return
+        etag = data_etag(store)
+        headers = [(b"etag", etag.encode()), (b"cache-control", b"no-cache")]
+        if_none_match = dict(scope["headers"]).get(b"if-none-match", b"").decode()
+        if etag in [tag.strip() for tag in if_none_match.split(",")]:
+            await send({"type": "http.response.start", "status": 304, "headers": headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+        body = cached_body((scope["path"], scope["query_string"], etag), store, build)
+        await send_json(send, 200, body, headers, head=head)
+    except NotFound as e:
+        await send_json(send, 404, json.dumps({"error": str(e)}).encode(), head=head)
+    except BadRequest as e:
+        await send_json(send, 400, json.dumps({"error": str(e)}).encode(), head=head)
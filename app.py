@@ -1,9 +1,54 @@
 import streamlit as st
 import pandas as pd
+import altair as alt
+import base64
+import functools
 import json
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from pathlib import Path
 
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from bradness import (
+    DEFAULT_LEAGUE,
+    describe_edit,
+    build_chart_frames,
+    build_snapshots,
+    build_timeline,
+    calculate_points,
+    catch_up,
+    chart_slice,
+    commit_edits,
+    export_csv,
+    export_parquet,
+    get_all_weeks,
+    get_leaderboard,
+    get_member_breakdown,
+    get_member_category_points,
+    get_member_weeks,
+    get_range_leaderboard,
+    get_rank_history,
+    get_rank_movement,
+    get_trailing_leaderboard,
+    get_week_key,
+    get_weekly_leaderboard,
+    json_leaderboard,
+    list_leagues,
+    load_json_at,
+    locked,
+    make_registry,
+    open_store,
+    parse_event_time,
+    plan_import,
+    read_activity_file,
+    recent_events,
+    sparse_counts,
+    sync_store,
+)
+
 st.set_page_config(page_title="March Bradness", page_icon="🏀", layout="wide")
 
 st.markdown("""
@@ -49,112 +94,302 @@ st.markdown("""
     .stRadio > div {
         margin-bottom: 0.5rem;
     }
+    .st-key-bang_sound {
+        display: none;
+    }
 </style>
 """, unsafe_allow_html=True)
 
-CATEGORIES = {
-    "Summit Registrants": 5,
-    "CoCo App Creation": 30,
-    "In-Person Meetings": 30,
-    "Hands On Labs": 50,
-    "CECs": 50,
-    "Implementation Starts": 50,
-    "New POCs Started": 80,
-    "Technical Wins": 160,
-    "Go-Lives": 160,
-}
-
-DATA_FILE = Path(__file__).parent / "march_bradness_data.json"
 LOGO_FILE = Path(__file__).parent / "logo.png"
 BANG_SOUND_FILE = Path(__file__).parent / "MikeBreenBang.mp3"
+SNOWFLAKE_ICON_FILE = Path(__file__).parent / "snowflake_icon.png"
+STATIC_DIR = Path(__file__).parent / "static"
+LOGO_HEIGHT = 280
+PATTERN_SIZE = 50
+STANDINGS_PAGE_SIZE = 25
+STANDINGS_TOP_N = [None, 10, 25, 50]
+RANGE_PRESETS = {"Last 4 Weeks": 4, "Last 8 Weeks": 8, "Last 13 Weeks": 13}
+RANK_CHART_DEFAULT = 5
+HISTORY_EVENTS = 50
+PROFILE_HISTORY = 20
+PROFILED_FUNCTIONS = [
+    "get_store",
+    "sync_store",
+    "get_timeline",
+    "get_snapshots",
+    "get_recent_events",
+    "get_rank_movement",
+    "build_assets",
+    "get_leaderboard",
+    "get_all_weeks",
+    "get_weekly_leaderboard",
+    "get_range_leaderboard",
+    "get_trailing_leaderboard",
+    "get_member_breakdown",
+    "get_member_category_points",
+    "get_chart_frames",
+    "get_member_weeks",
+    "calculate_points",
+    "commit_edits",
+    "plan_import",
+]
+
+
+def resize_to_webp(source, target, height):
+    from PIL import Image
+
+    if target.exists() and target.stat().st_mtime_ns >= source.stat().st_mtime_ns:
+        return target
+    with Image.open(source) as img:
+        width = round(img.width * height / img.height)
+        img.resize((width, height), Image.LANCZOS).save(target, "WEBP", quality=85)
+    return target
+
+
+def asset_src(path, mime):
+    # Static serving gives the browser a cacheable URL; inline is the fallback.
+    if st.get_option("server.enableStaticServing"):
+        return f"app/static/{path.name}?v={path.stat().st_mtime_ns}"
+    return f"data:{mime};base64,{base64.b64encode(path.read_bytes()).decode()}"
+
+
+@st.cache_resource
+def build_assets():
+    STATIC_DIR.mkdir(exist_ok=True)
+    assets = {}
+    if LOGO_FILE.exists():
+        logo = resize_to_webp(LOGO_FILE, STATIC_DIR / "logo.webp", LOGO_HEIGHT)
+        assets["logo"] = asset_src(logo, "image/webp")
+    if SNOWFLAKE_ICON_FILE.exists():
+        icon = resize_to_webp(SNOWFLAKE_ICON_FILE, STATIC_DIR / "snowflake_icon.webp", PATTERN_SIZE)
+        assets["pattern"] = f"url('{asset_src(icon, 'image/webp')}')"
+    return assets
 
 
-def load_data():
-    if DATA_FILE.exists():
-        with open(DATA_FILE, "r") as f:
-            return json.load(f)
-    return {"team_members": [], "weekly_data": {}}
-
-
-def save_data(data):
-    with open(DATA_FILE, "w") as f:
-        json.dump(data, f, indent=2)
-
-
-def get_week_key(date):
-    start = date - timedelta(days=date.weekday())
-    return start.strftime("%Y-%m-%d")
-
-
-def calculate_points(activities):
-    total = 0
-    for category, count in activities.items():
-        if category in CATEGORIES:
-            total += CATEGORIES[category] * count
-    return total
+def header_html(assets):
+    return f"""
+        <div style="position: relative; width: 100%; height: 300px; overflow: hidden; margin-bottom: 0.5rem; border-radius: 8px;">
+            <div style="position: absolute; top: 0; left: 0; right: 0; bottom: 0; background-color: #000000; background-image: {assets.get("pattern", "")}; background-repeat: repeat; background-size: {PATTERN_SIZE}px {PATTERN_SIZE}px; opacity: 0.7;"></div>
+            <div style="position: relative; width: 100%; height: 100%; display: flex; justify-content: center; align-items: center;">
+                <img src="{assets["logo"]}" 
+                     style="max-height: {LOGO_HEIGHT}px; object-fit: contain;">
+            </div>
+        </div>
+        """
 
 
-def get_leaderboard(data):
-    scores = {}
-    for member in data["team_members"]:
-        total = 0
-        for week_key, week_data in data["weekly_data"].items():
-            if member in week_data:
-                total += calculate_points(week_data[member])
-        scores[member] = total
-    return dict(sorted(scores.items(), key=lambda x: x[1], reverse=True))
+@st.cache_resource
+def get_registry():
+    # Shared by every session of this server process.
+    return make_registry()
 
 
-def get_member_breakdown(data, member):
-    breakdown = {cat: 0 for cat in CATEGORIES}
-    for week_key, week_data in data["weekly_data"].items():
-        if member in week_data:
-            for cat, count in week_data[member].items():
-                if cat in breakdown:
-                    breakdown[cat] += count
-    return breakdown
+def get_store(league):
+    return open_store(get_registry(), league)
 
 
-def get_member_weekly_points(data, member):
-    weekly = {}
-    for week_key, week_data in data["weekly_data"].items():
-        if member in week_data:
-            pts = calculate_points(week_data[member])
-            if pts > 0:
-                weekly[week_key] = pts
-    return dict(sorted(weekly.items()))
+def get_timeline(store):
+    # Rebuilt at most once per data version, however many range queries follow.
+    with store["lock"]:
+        if store["timeline"] is None:
+            store["timeline"] = build_timeline(store["aggregates"])
+        return store["timeline"]
 
 
-def get_weekly_leaderboard(data, week_key):
-    scores = {}
-    if week_key in data["weekly_data"]:
-        for member in data["team_members"]:
-            if member in data["weekly_data"][week_key]:
-                scores[member] = calculate_points(data["weekly_data"][week_key][member])
-            else:
-                scores[member] = 0
-    else:
-        for member in data["team_members"]:
-            scores[member] = 0
-    return dict(sorted(scores.items(), key=lambda x: x[1], reverse=True))
+def get_snapshots(store):
+    # One lock hold, so snapshots are never built from a timeline a write has
+    # since cleared and then kept as current.
+    with store["lock"]:
+        if store["timeline"] is None:
+            store["timeline"] = build_timeline(store["aggregates"])
+        if store["snapshots"] is None:
+            store["snapshots"] = build_snapshots(store["timeline"])
+        return store["snapshots"]
 
 
-def get_all_weeks(data):
-    weeks = set()
-    for week_key in data["weekly_data"]:
-        for member_data in data["weekly_data"][week_key].values():
-            if any(v > 0 for v in member_data.values()):
-                weeks.add(week_key)
-                break
-    return sorted(weeks, reverse=True)
+def get_recent_events(store):
+    # Read from the log once per store, then kept current by commit_edits and
+    # catch_up; the file lock keeps a compaction from moving the log mid-read.
+    with store["lock"]:
+        if store["recent"] is None:
+            with locked(store["league"], shared=True):
+                catch_up(store)
+                store["recent"] = deque(recent_events(store["league"], HISTORY_EVENTS), maxlen=HISTORY_EVENTS)
+        return list(store["recent"])
+
+
+def move_label(change):
+    if not change:
+        return "–"
+    return f"▲{change}" if change > 0 else f"▼{-change}"
+
+
+def get_chart_frames(store):
+    # Built once per data version and shared by every session, like the timeline.
+    with store["lock"]:
+        if store["frames"] is None:
+            store["frames"] = build_chart_frames(store["data"], store["aggregates"])
+        return store["frames"]
+
+
+def session_id():
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx else None
+
+
+def commit_edit(store, edit):
+    return commit_edits(store, [edit], session_id())
+
+
+def export_store(store, fmt):
+    with store["lock"]:
+        return export_parquet(store["data"]) if fmt == "parquet" else export_csv(store["data"])
+
+
+def start_profile():
+    # One rerun's profile: time per section, the elements and bytes Streamlit
+    # sent while each section was open, and calls to the scoring functions.
+    return {"started": time.perf_counter(), "spans": {}, "stack": [], "calls": Counter(), "elements": 0, "bytes": 0}
+
+
+def watch_messages(profile):
+    # Streamlit has no public hook for outgoing messages, so the session's send
+    # function is wrapped once and pointed at the current rerun's profile.
+    ctx = get_script_run_ctx()
+    if ctx is None:
+        return
+    if not hasattr(ctx._enqueue, "profile"):
+        send = ctx._enqueue
+
+        def counting_send(msg):
+            current = counting_send.profile
+            if current is not None and msg.WhichOneof("type") == "delta":
+                size = msg.ByteSize()
+                for entry in [current] + [current["spans"][name] for name in current["stack"]]:
+                    entry["elements"] += 1
+                    entry["bytes"] += size
+            send(msg)
+
+        counting_send.profile = None
+        counting_send.send = send
+        ctx._enqueue = counting_send
+    ctx._enqueue.profile = profile
+
+
+def unwatch_messages():
+    # Puts the session's own send function back once profiling is switched off.
+    ctx = get_script_run_ctx()
+    if ctx is not None and hasattr(ctx._enqueue, "profile"):
+        ctx._enqueue = ctx._enqueue.send
+
+
+def counted(name, fn):
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        profile["calls"][name] += 1
+        return fn(*args, **kwargs)
+    return wrapper
+
+
+@contextmanager
+def span(name):
+    if profile is None:
+        yield
+        return
+    entry = profile["spans"].setdefault(name, {"depth": len(profile["stack"]), "calls": 0, "ms": 0.0, "elements": 0, "bytes": 0})
+    entry["calls"] += 1
+    profile["stack"].append(name)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        entry["ms"] += (time.perf_counter() - start) * 1000
+        profile["stack"].pop()
+
+
+def finish_profile(profile):
+    run = {
+        "at": datetime.now().isoformat(timespec="seconds"),
+        "league": league_slug,
+        "ms": (time.perf_counter() - profile["started"]) * 1000,
+        "elements": profile["elements"],
+        "bytes": profile["bytes"],
+        "spans": profile["spans"],
+        "calls": dict(profile["calls"]),
+    }
+    history = st.session_state.setdefault("render_profiles", [])
+    history.append(run)
+    del history[:-PROFILE_HISTORY]
+    return run
+
+
+def render_profile(run):
+    with st.expander(f"Render profile — {run['ms']:,.0f} ms, {run['elements']:,} elements, {run['bytes'] / 1024:,.1f} KB", expanded=True):
+        st.dataframe(
+            pd.DataFrame(
+                [
+                    {
+                        "Section": "\u2003" * entry["depth"] + name,
+                        "Calls": entry["calls"],
+                        "ms": round(entry["ms"], 1),
+                        "% of rerun": round(100 * entry["ms"] / run["ms"], 1),
+                        "Elements": entry["elements"],
+                        "KB": round(entry["bytes"] / 1024, 1),
+                    }
+                    for name, entry in run["spans"].items()
+                ]
+            ),
+            hide_index=True,
+            use_container_width=True,
+        )
+        st.dataframe(
+            pd.DataFrame(sorted(run["calls"].items(), key=lambda x: x[1], reverse=True), columns=["Function", "Calls"]),
+            hide_index=True,
+            use_container_width=True,
+        )
+        st.download_button(
+            f"Export last {len(st.session_state.render_profiles)} reruns as JSON",
+            data=json.dumps(st.session_state.render_profiles, indent=2),
+            file_name="render_profile.json",
+            mime="application/json",
+        )
 
 
-st.session_state.setdefault("data", load_data())
+# ?admin=1 turns on the render profile for this session's reruns.
+profile = start_profile() if st.query_params.get("admin") == "1" else None
+if profile is not None:
+    watch_messages(profile)
+    for name in PROFILED_FUNCTIONS:
+        globals()[name] = counted(name, globals()[name])
+else:
+    unwatch_messages()
+
+leagues = list_leagues()
+league_slug = st.query_params.get("league", DEFAULT_LEAGUE)
+if league_slug not in leagues:
+    st.warning(f"No league named '{league_slug}'. Showing {leagues[DEFAULT_LEAGUE]['name']}.")
+    league_slug = DEFAULT_LEAGUE
+with span("Load league"):
+    store = get_store(leagues[league_slug])
+    sync_store(store)
+# Writes replace these rather than change them, so the rerun reads one version throughout.
+data, agg = store["data"], store["aggregates"]
 st.session_state.setdefault("music_playing", True)
 
-SNOWFLAKE_ICON_FILE = Path(__file__).parent / "snowflake_icon.png"
-
 music_col1, music_col2 = st.columns([10, 1])
+with music_col1:
+    if len(leagues) > 1:
+        league_choice = st.selectbox(
+            "League",
+            list(leagues),
+            index=list(leagues).index(league_slug),
+            format_func=lambda slug: leagues[slug]["name"],
+            label_visibility="collapsed",
+            width=300,
+        )
+        if league_choice != league_slug:
+            st.query_params["league"] = league_choice
+            st.rerun()
 with music_col2:
     music_toggle = st.toggle("🔊", value=st.session_state.music_playing, help="Toggle music")
     if music_toggle != st.session_state.music_playing:
@@ -180,50 +415,69 @@ st.markdown(
     unsafe_allow_html=True
 )
 
-if LOGO_FILE.exists():
-    import base64
-    with open(LOGO_FILE, "rb") as f:
-        logo_data = base64.b64encode(f.read()).decode()
-    
-    snowflake_pattern = ""
-    if SNOWFLAKE_ICON_FILE.exists():
-        with open(SNOWFLAKE_ICON_FILE, "rb") as f:
-            icon_data = base64.b64encode(f.read()).decode()
-        snowflake_pattern = f"url('data:image/png;base64,{icon_data}')"
-    
-    st.markdown(
-        f"""
-        <div style="position: relative; width: 100%; height: 300px; overflow: hidden; margin-bottom: 0.5rem; border-radius: 8px;">
-            <div style="position: absolute; top: 0; left: 0; right: 0; bottom: 0; background-color: #000000; background-image: {snowflake_pattern}; background-repeat: repeat; background-size: 50px 50px; opacity: 0.7;"></div>
-            <div style="position: relative; width: 100%; height: 100%; display: flex; justify-content: center; align-items: center;">
-                <img src="data:image/png;base64,{logo_data}" 
-                     style="max-height: 280px; object-fit: contain;">
-            </div>
-        </div>
-        """,
-        unsafe_allow_html=True,
-    )
+with span("Header"):
+    assets = build_assets()
+    if "logo" in assets:
+        st.markdown(header_html(assets), unsafe_allow_html=True)
 
-tab1, tab2, tab3 = st.tabs(["Leaderboard", "Enter Points", "Manage Team"])
+tab1, tab2, tab3, tab4, tab5 = st.tabs(["Leaderboard", "Enter Points", "Manage Team", "Import / Export", "History"])
 
-with tab1:
-    leaderboard = get_leaderboard(st.session_state.data)
+with tab1, span("Leaderboard tab"):
+    leaderboard = get_leaderboard(agg)
     
     if not leaderboard:
         st.info("No team members yet. Add members in the 'Manage Team' tab.")
     else:
-        all_weeks = get_all_weeks(st.session_state.data)
+        timeline = get_timeline(store)
+        all_weeks = get_all_weeks(timeline)
         
         view_mode = st.radio(
             "View",
-            ["All Time", "By Week"],
+            ["All Time", "By Week", "Date Range", "Movement"],
             horizontal=True,
             label_visibility="collapsed"
         )
         
-        if view_mode == "By Week" and all_weeks:
+        if view_mode == "Date Range":
+            today = datetime.now().date()
+            col1, col2 = st.columns([1, 2])
+            with col1:
+                range_preset = st.selectbox("Range", list(RANGE_PRESETS) + ["Month to Date", "Custom"])
+            if range_preset == "Custom":
+                default_range = (today - timedelta(weeks=3), today)
+                with col2:
+                    picked = st.date_input("Dates", value=default_range)
+                # The picker gives one date mid-selection and none once cleared.
+                if not picked:
+                    picked = default_range
+                range_start, range_end = picked if len(picked) == 2 else (picked[0], picked[0])
+                range_lb = get_range_leaderboard(agg, timeline, range_start, range_end)
+            elif range_preset == "Month to Date":
+                range_start, range_end = today.replace(day=1), today
+                range_lb = get_range_leaderboard(agg, timeline, range_start, range_end)
+            else:
+                range_start, range_end = today - timedelta(weeks=RANGE_PRESETS[range_preset] - 1), today
+                range_lb = get_trailing_leaderboard(agg, timeline, RANGE_PRESETS[range_preset], today)
+            
+            st.caption(f"Weeks of {get_week_key(range_start)} through {get_week_key(range_end)}")
+            with st.container(horizontal=True):
+                st.metric("Range Total Points", f"{sum(range_lb.values()):,}", border=True)
+                st.metric("Team Members", len([m for m, p in range_lb.items() if p > 0]), border=True)
+                range_leader = next(iter(range_lb))
+                if range_lb[range_leader] > 0:
+                    st.metric("Range Leader", range_leader, f"{range_lb[range_leader]:,} pts", border=True)
+            
+            st.dataframe(
+                pd.DataFrame(
+                    [{"Rank": rank, "Member": member, "Points": points} for rank, (member, points) in enumerate(range_lb.items(), 1)]
+                ),
+                hide_index=True,
+                use_container_width=True,
+            )
+        
+        elif view_mode == "By Week" and all_weeks:
             selected_week_view = st.selectbox("Select Week", all_weeks, format_func=lambda x: f"Week of {x}")
-            weekly_lb = get_weekly_leaderboard(st.session_state.data, selected_week_view)
+            weekly_lb = get_weekly_leaderboard(agg, selected_week_view)
             
             with st.container(horizontal=True):
                 week_total = sum(weekly_lb.values())
@@ -236,118 +490,170 @@ with tab1:
             
             st.subheader(f"Week of {selected_week_view}")
             
+            frames = None
             for rank, (member, points) in enumerate(weekly_lb.items(), 1):
                 if points == 0:
                     continue
                 medal = "🥇" if rank == 1 else "🥈" if rank == 2 else "🥉" if rank == 3 else f"#{rank}"
                 
-                with st.expander(f"{medal} **{member}** — {points:,} points"):
-                    week_data = st.session_state.data["weekly_data"].get(selected_week_view, {}).get(member, {})
+                with st.expander(f"{medal} **{member}** — {points:,} points"), span("Week member detail"):
+                    if frames is None:
+                        frames = get_chart_frames(store)
+                    week_data = data.get_counts(selected_week_view, member)
+                    week_points = data.table_for(selected_week_view)["points"]
                     col1, col2 = st.columns(2)
                     with col1:
                         st.markdown("**Activity Counts**")
                         for cat, count in week_data.items():
                             if count > 0:
-                                pts = count * CATEGORIES[cat]
+                                pts = count * week_points[cat]
                                 st.write(f"- {cat}: **{count}** ({pts:,} pts)")
                     with col2:
                         st.markdown("**Points by Category**")
-                        chart_data = [{"Category": cat, "Points": count * CATEGORIES[cat]} for cat, count in week_data.items() if count > 0]
-                        if chart_data:
-                            st.bar_chart(pd.DataFrame(chart_data), x="Category", y="Points", horizontal=True)
+                        chart_data = chart_slice(frames, "week_categories", (selected_week_view, member))
+                        if len(chart_data):
+                            st.bar_chart(chart_data, x="Category", y="Points", horizontal=True)
         
         elif view_mode == "By Week" and not all_weeks:
             st.info("No weekly data yet. Enter points in the 'Enter Points' tab.")
         
+        elif view_mode == "Movement":
+            snapshots = get_snapshots(store)
+            if not snapshots["weeks"]:
+                st.info("No weekly data yet. Enter points in the 'Enter Points' tab.")
+            else:
+                movement_week = st.selectbox("Standings after", all_weeks, format_func=lambda x: f"Week of {x}")
+                movement = get_rank_movement(agg, snapshots, movement_week)
+                
+                with st.container(horizontal=True):
+                    climber, climb = max(movement.items(), key=lambda x: x[1]["change"] or 0)
+                    if climb["change"]:
+                        st.metric("Biggest Climber", climber, f"{move_label(climb['change'])} to #{climb['rank']}", border=True)
+                    hot, hot_stats = max(movement.items(), key=lambda x: x[1]["streak"])
+                    if hot_stats["streak"]:
+                        st.metric("Longest Active Streak", hot, f"{hot_stats['streak']} weeks", border=True)
+                
+                st.dataframe(
+                    pd.DataFrame([
+                        {
+                            "Rank": stats["rank"],
+                            "Move": move_label(stats["change"]),
+                            "Member": member,
+                            "Points": stats["points"],
+                            "Week Points": stats["week_points"],
+                            "Streak": stats["streak"],
+                            "Best Streak": stats["best_streak"],
+                        }
+                        for member, stats in movement.items()
+                    ]),
+                    hide_index=True,
+                    use_container_width=True,
+                )
+                
+                st.markdown("**Rank Over Time**")
+                chart_members = st.multiselect("Members", list(movement), default=list(movement)[:RANK_CHART_DEFAULT], label_visibility="collapsed")
+                if chart_members:
+                    st.altair_chart(
+                        alt.Chart(get_rank_history(agg, snapshots, chart_members))
+                        .mark_line(point=True)
+                        .encode(
+                            x="Week:O",
+                            y=alt.Y("Rank:Q", scale=alt.Scale(reverse=True, domainMin=1)),
+                            color="Member:N",
+                        ),
+                        use_container_width=True,
+                    )
+        
         else:
             top_3 = list(leaderboard.items())[:3]
-            if len(top_3) >= 3 and top_3[0][1] > 0:
-                st.markdown(
-                    """
-                    <style>
-                    .podium-container {
-                        display: flex;
-                        justify-content: center;
-                        align-items: flex-end;
-                        gap: 15px;
-                        margin: 0 auto 1rem auto;
-                        max-width: 900px;
-                    }
-                    .podium-place {
-                        display: flex;
-                        flex-direction: column;
-                        align-items: center;
-                        text-align: center;
-                    }
-                    .podium-name {
-                        font-weight: bold;
-                        font-size: 1.1rem;
-                        margin-bottom: 5px;
-                        color: #000000;
-                    }
-                    .podium-points {
-                        font-size: 0.9rem;
-                        color: #555555;
-                        margin-bottom: 8px;
-                    }
-                    .podium-block {
-                        width: 220px;
-                        display: flex;
-                        justify-content: center;
-                        align-items: center;
-                        font-size: 2rem;
-                        font-weight: bold;
-                        color: #ffffff;
-                        border-radius: 8px 8px 0 0;
-                    }
-                    .gold-block {
-                        background: linear-gradient(180deg, #c41e3a 0%, #8b1528 100%);
-                        height: 100px;
-                    }
-                    .silver-block {
-                        background: linear-gradient(180deg, #1a2744 0%, #0f1829 100%);
-                        height: 70px;
-                    }
-                    .bronze-block {
-                        background: linear-gradient(180deg, #6eb5e0 0%, #4a95c0 100%);
-                        height: 50px;
-                    }
-                    .medal-emoji {
-                        font-size: 2.5rem;
-                        margin-bottom: 5px;
-                    }
-                    </style>
-                    """,
-                    unsafe_allow_html=True
-                )
+            with span("Podium"):
+                if len(top_3) >= 3 and top_3[0][1] > 0:
+                    st.markdown(
+                        """
+                        <style>
+                        .podium-container {
+                            display: flex;
+                            justify-content: center;
+                            align-items: flex-end;
+                            gap: 15px;
+                            margin: 0 auto 1rem auto;
+                            max-width: 900px;
+                        }
+                        .podium-place {
+                            display: flex;
+                            flex-direction: column;
+                            align-items: center;
+                            text-align: center;
+                        }
+                        .podium-name {
+                            font-weight: bold;
+                            font-size: 1.1rem;
+                            margin-bottom: 5px;
+                            color: #000000;
+                        }
+                        .podium-points {
+                            font-size: 0.9rem;
+                            color: #555555;
+                            margin-bottom: 8px;
+                        }
+                        .podium-block {
+                            width: 220px;
+                            display: flex;
+                            justify-content: center;
+                            align-items: center;
+                            font-size: 2rem;
+                            font-weight: bold;
+                            color: #ffffff;
+                            border-radius: 8px 8px 0 0;
+                        }
+                        .gold-block {
+                            background: linear-gradient(180deg, #c41e3a 0%, #8b1528 100%);
+                            height: 100px;
+                        }
+                        .silver-block {
+                            background: linear-gradient(180deg, #1a2744 0%, #0f1829 100%);
+                            height: 70px;
+                        }
+                        .bronze-block {
+                            background: linear-gradient(180deg, #6eb5e0 0%, #4a95c0 100%);
+                            height: 50px;
+                        }
+                        .medal-emoji {
+                            font-size: 2.5rem;
+                            margin-bottom: 5px;
+                        }
+                        </style>
+                        """,
+                        unsafe_allow_html=True
+                    )
                 
-                second = top_3[1] if len(top_3) > 1 else ("", 0)
-                first = top_3[0]
-                third = top_3[2] if len(top_3) > 2 else ("", 0)
+                    second = top_3[1] if len(top_3) > 1 else ("", 0)
+                    first = top_3[0]
+                    third = top_3[2] if len(top_3) > 2 else ("", 0)
                 
-                podium_html = f"""
-                <div class="podium-container">
-                    <div class="podium-place">
-                        <div class="medal-emoji">🥈</div>
-                        <div class="podium-name">{second[0]}</div>
-                        <div class="podium-points">{second[1]:,} pts</div>
-                        <div class="podium-block silver-block">2</div>
-                    </div>
-                    <div class="podium-place">
-                        <div class="medal-emoji">🥇</div>
-                        <div class="podium-name">{first[0]}</div>
-                        <div class="podium-points">{first[1]:,} pts</div>
-                        <div class="podium-block gold-block">1</div>
-                    </div>
-                    <div class="podium-place">
-                        <div class="medal-emoji">🥉</div>
-                        <div class="podium-name">{third[0]}</div>
-                        <div class="podium-points">{third[1]:,} pts</div>
-                        <div class="podium-block bronze-block">3</div>
+                    podium_html = f"""
+                    <div class="podium-container">
+                        <div class="podium-place">
+                            <div class="medal-emoji">🥈</div>
+                            <div class="podium-name">{second[0]}</div>
+                            <div class="podium-points">{second[1]:,} pts</div>
+                            <div class="podium-block silver-block">2</div>
+                        </div>
+                        <div class="podium-place">
+                            <div class="medal-emoji">🥇</div>
+                            <div class="podium-name">{first[0]}</div>
+                            <div class="podium-points">{first[1]:,} pts</div>
+                            <div class="podium-block gold-block">1</div>
+                        </div>
+                        <div class="podium-place">
+                            <div class="medal-emoji">🥉</div>
+                            <div class="podium-name">{third[0]}</div>
+                            <div class="podium-points">{third[1]:,} pts</div>
+                            <div class="podium-block bronze-block">3</div>
+                        </div>
                     </div>
-                </div>
-                """
-                st.markdown(podium_html, unsafe_allow_html=True)
+                    """
+                    st.markdown(podium_html, unsafe_allow_html=True)
             
             with st.container(horizontal=True):
                 total_points = sum(leaderboard.values())
@@ -357,112 +663,154 @@ with tab1:
                     leader = list(leaderboard.keys())[0]
                     st.metric("Current Leader", leader, f"{leaderboard[leader]:,} pts", border=True)
             
-            st.subheader("Standings")
+            with span("Standings"):
+                st.subheader("Standings")
             
-            for rank, (member, points) in enumerate(leaderboard.items(), 1):
-                medal = "🥇" if rank == 1 else "🥈" if rank == 2 else "🥉" if rank == 3 else f"#{rank}"
+                search_col, top_col = st.columns([3, 1])
+                with search_col:
+                    search = st.text_input("Search members", placeholder="Search members", label_visibility="collapsed")
+                with top_col:
+                    top_n = st.selectbox("Show", STANDINGS_TOP_N, format_func=lambda n: f"Top {n}" if n else "All", label_visibility="collapsed")
+            
+                standings = list(enumerate(leaderboard.items(), 1))
+                if top_n:
+                    standings = standings[:top_n]
+                if search:
+                    standings = [row for row in standings if search.lower() in row[1][0].lower()]
+            
+                page_count = max(1, -(-len(standings) // STANDINGS_PAGE_SIZE))
+                page = 1
+                if page_count > 1:
+                    page = st.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, value=1)
+                page_start = (page - 1) * STANDINGS_PAGE_SIZE
+            
+                if not standings:
+                    st.caption("No members match.")
+            
+                frames = None
+                movement = get_rank_movement(agg, get_snapshots(store))
+                for rank, (member, points) in standings[page_start:page_start + STANDINGS_PAGE_SIZE]:
+                    medal = "🥇" if rank == 1 else "🥈" if rank == 2 else "🥉" if rank == 3 else f"#{rank}"
+                    move = move_label(movement[member]["change"]) if member in movement else ""
                 
-                with st.expander(f"{medal} **{member}** — {points:,} points"):
-                    breakdown = get_member_breakdown(st.session_state.data, member)
-                    weekly_points = get_member_weekly_points(st.session_state.data, member)
+                    # Detail is only computed and sent for the expander the user has opened.
+                    member_expander = st.expander(f"{medal} **{member}** — {points:,} points {move}", key=f"standings_{member}", on_change="rerun")
+                    if not member_expander.open:
+                        continue
+                    with member_expander, span("Member detail"):
+                        if frames is None:
+                            frames = get_chart_frames(store)
+                        breakdown = get_member_breakdown(agg, member)
+                        category_points = get_member_category_points(agg, member)
                     
-                    col1, col2 = st.columns(2)
+                        col1, col2 = st.columns(2)
                     
-                    with col1:
-                        st.markdown("**Activity Counts (All Time)**")
-                        for cat, count in breakdown.items():
-                            if count > 0:
-                                pts = count * CATEGORIES[cat]
-                                st.write(f"- {cat}: **{count}** ({pts:,} pts)")
+                        with col1:
+                            st.markdown("**Activity Counts (All Time)**")
+                            for cat, count in breakdown.items():
+                                if count > 0:
+                                    pts = category_points[cat]
+                                    st.write(f"- {cat}: **{count}** ({pts:,} pts)")
                     
-                    with col2:
-                        st.markdown("**Points by Category**")
-                        chart_data = []
-                        for cat, count in breakdown.items():
-                            if count > 0:
-                                chart_data.append({"Category": cat, "Points": count * CATEGORIES[cat]})
-                        if chart_data:
-                            df = pd.DataFrame(chart_data)
-                            st.bar_chart(df, x="Category", y="Points", horizontal=True)
+                        with col2:
+                            st.markdown("**Points by Category**")
+                            chart_data = chart_slice(frames, "categories", member)
+                            if len(chart_data):
+                                st.bar_chart(chart_data, x="Category", y="Points", horizontal=True)
                     
-                    if weekly_points:
-                        st.markdown("**Points by Week**")
-                        week_df = pd.DataFrame([
-                            {"Week": wk, "Points": pts} for wk, pts in weekly_points.items()
-                        ])
-                        st.bar_chart(week_df, x="Week", y="Points")
-
-def get_member_weeks(data, member):
-    weeks = []
-    for week_key, week_data in data["weekly_data"].items():
-        if member in week_data and any(v > 0 for v in week_data[member].values()):
-            weeks.append(week_key)
-    return sorted(weeks, reverse=True)
-
-with tab2:
-    if not st.session_state.data["team_members"]:
+                        week_df = chart_slice(frames, "weeks", member)
+                        if len(week_df):
+                            st.markdown("**Points by Week**")
+                            st.bar_chart(week_df, x="Week", y="Points")
+
+with tab2, span("Enter Points tab"):
+    if not data.members:
         st.warning("Add team members first in the 'Manage Team' tab.")
     else:
         col1, col2 = st.columns(2)
         with col1:
-            selected_member = st.selectbox("Team Member", st.session_state.data["team_members"])
+            selected_member = st.selectbox("Team Member", data.members)
         with col2:
             selected_week = st.date_input("Week of", value=datetime.now())
         
         week_key = get_week_key(selected_week)
         
-        existing_weeks = get_member_weeks(st.session_state.data, selected_member)
+        existing_weeks = get_member_weeks(agg, selected_member)
         if existing_weeks:
             st.caption(f"Editing week: **{week_key}** | Previous entries: {', '.join(existing_weeks)}")
         else:
             st.caption(f"Entering data for week starting: {week_key}")
         
-        if week_key not in st.session_state.data["weekly_data"]:
-            st.session_state.data["weekly_data"][week_key] = {}
-        if selected_member not in st.session_state.data["weekly_data"][week_key]:
-            st.session_state.data["weekly_data"][week_key][selected_member] = {cat: 0 for cat in CATEGORIES}
-        
-        current = st.session_state.data["weekly_data"][week_key][selected_member]
-        
+        current = data.get_counts(week_key, selected_member)
+        cell_key = f"{selected_member}_{week_key}"
+        week_points = data.table_for(week_key)["points"]
+        # The version the inputs were filled from; saving is checked against it.
+        # Inputs refill from the store whenever their widget state is gone, so
+        # the base is re-read then too.
+        base_key = f"base_{cell_key}"
+        if base_key not in st.session_state or not any(f"input_{category}_{cell_key}" in st.session_state for category in week_points):
+            st.session_state[base_key] = data.version(week_key, selected_member)
+        base_version = st.session_state[base_key]
+
         st.subheader("Enter Activity Counts")
-        
+
         new_values = {}
         cols = st.columns(3)
-        for i, (category, point_value) in enumerate(CATEGORIES.items()):
+        for i, (category, point_value) in enumerate(week_points.items()):
             with cols[i % 3]:
                 new_values[category] = st.number_input(
                     f"{category} ({point_value} pts each)",
                     min_value=0,
                     value=current.get(category, 0),
-                    key=f"input_{category}_{selected_member}_{week_key}"
+                    key=f"input_{category}_{cell_key}"
                 )
         
-        weekly_total = calculate_points(new_values)
+        weekly_total = calculate_points(new_values, week_points)
         st.metric("Weekly Points Total", f"{weekly_total:,}", border=True)
         
+        edit = {"op": "set_points", "week": week_key, "member": selected_member, "counts": sparse_counts(new_values)}
         if st.button("Save Points", type="primary", use_container_width=True):
-            st.session_state.data["weekly_data"][week_key][selected_member] = new_values
-            save_data(st.session_state.data)
-            st.session_state["play_bang"] = True
-            st.success(f"Saved {weekly_total:,} points for {selected_member} (Week of {week_key})")
-            st.rerun()
+            if commit_edit(store, {**edit, "base": base_version}):
+                st.session_state["conflict"] = cell_key
+            else:
+                del st.session_state[f"base_{cell_key}"]
+                st.session_state["play_bang"] = True
+                st.success(f"Saved {weekly_total:,} points for {selected_member} (Week of {week_key})")
+                st.rerun()
+        
+        if st.session_state.get("conflict") == cell_key:
+            # commit_edit may have reloaded the store, so read the saved cell from it.
+            theirs = store["data"].get_counts(week_key, selected_member)
+            st.error(f"Someone else saved {selected_member}'s week of {week_key} while you were editing. Nothing was saved.")
+            st.dataframe(
+                pd.DataFrame(
+                    [{"Category": cat, "Saved": theirs.get(cat, 0), "Yours": new_values[cat]} for cat in week_points]
+                ),
+                hide_index=True,
+                use_container_width=True,
+            )
+            col1, col2 = st.columns(2)
+            with col1:
+                if st.button("Overwrite with mine", use_container_width=True):
+                    if not commit_edit(store, {**edit, "base": store["data"].version(week_key, selected_member)}):
+                        del st.session_state["conflict"], st.session_state[f"base_{cell_key}"]
+                        st.session_state["play_bang"] = True
+                    st.rerun()
+            with col2:
+                if st.button("Keep saved values", use_container_width=True):
+                    for category in week_points:
+                        st.session_state.pop(f"input_{category}_{cell_key}", None)
+                    del st.session_state["conflict"], st.session_state[f"base_{cell_key}"]
+                    st.rerun()
         
         if st.session_state.get("play_bang", False):
             if BANG_SOUND_FILE.exists():
-                import base64
-                with open(BANG_SOUND_FILE, "rb") as f:
-                    bang_audio = base64.b64encode(f.read()).decode()
-                st.markdown(
-                    f"""
-                    <audio autoplay>
-                        <source src="data:audio/mp3;base64,{bang_audio}" type="audio/mp3">
-                    </audio>
-                    """,
-                    unsafe_allow_html=True
-                )
+                # Served from Streamlit's media endpoint by URL rather than inlined.
+                with st.container(key="bang_sound"):
+                    st.audio(str(BANG_SOUND_FILE), format="audio/mp3", autoplay=True)
             st.session_state["play_bang"] = False
 
-with tab3:
+with tab3, span("Manage Team tab"):
     st.subheader("Team Members")
     
     col1, col2 = st.columns([2, 1])
@@ -472,17 +820,16 @@ with tab3:
         st.write("")
         st.write("")
         if st.button("Add Member", use_container_width=True):
-            if new_member and new_member not in st.session_state.data["team_members"]:
-                st.session_state.data["team_members"].append(new_member)
-                save_data(st.session_state.data)
+            if new_member and new_member not in data.members:
+                commit_edit(store, {"op": "add_member", "member": new_member})
                 st.success(f"Added {new_member}")
                 st.rerun()
-            elif new_member in st.session_state.data["team_members"]:
+            elif new_member in data.members:
                 st.error("Member already exists")
     
-    if st.session_state.data["team_members"]:
+    if data.members:
         st.markdown("**Current Team:**")
-        for idx, member in enumerate(st.session_state.data["team_members"]):
+        for idx, member in enumerate(data.members):
             col1, col2, col3 = st.columns([3, 1, 1])
             with col1:
                 new_name = st.text_input(
@@ -494,28 +841,140 @@ with tab3:
             with col2:
                 if st.button("Rename", key=f"rename_{idx}", use_container_width=True):
                     if new_name and new_name != member:
-                        if new_name in st.session_state.data["team_members"]:
+                        if new_name in data.members:
                             st.error("Name already exists")
                         else:
-                            st.session_state.data["team_members"][idx] = new_name
-                            for week_key in st.session_state.data["weekly_data"]:
-                                if member in st.session_state.data["weekly_data"][week_key]:
-                                    st.session_state.data["weekly_data"][week_key][new_name] = st.session_state.data["weekly_data"][week_key].pop(member)
-                            save_data(st.session_state.data)
+                            commit_edit(store, {"op": "rename_member", "member": member, "new_name": new_name})
                             st.rerun()
             with col3:
                 if st.button("Remove", key=f"remove_{member}", use_container_width=True):
-                    st.session_state.data["team_members"].remove(member)
-                    for week_key in st.session_state.data["weekly_data"]:
-                        if member in st.session_state.data["weekly_data"][week_key]:
-                            del st.session_state.data["weekly_data"][week_key][member]
-                    save_data(st.session_state.data)
+                    commit_edit(store, {"op": "remove_member", "member": member})
                     st.rerun()
     
     st.divider()
     st.subheader("Point Values Reference")
     ref_df = pd.DataFrame([
-        {"Activity": cat, "Points": pts} 
-        for cat, pts in CATEGORIES.items()
+        {"Effective From": table["from"] or "Season start", **table["points"]}
+        for table in data.schedule
     ])
     st.dataframe(ref_df, hide_index=True, use_container_width=True)
+    
+    st.markdown("**Change Point Values**")
+    st.caption("New values apply from the chosen week onward. Earlier weeks keep the values they were scored with.")
+    effective_week = get_week_key(st.date_input("Effective from week of", value=datetime.now()))
+    with st.form("point_table_form"):
+        current_points = data.table_for(effective_week)["points"]
+        new_points = {}
+        cols = st.columns(3)
+        for i, (category, point_value) in enumerate(current_points.items()):
+            with cols[i % 3]:
+                new_points[category] = st.number_input(category, min_value=0, value=point_value, key=f"table_{category}_{effective_week}")
+        if st.form_submit_button("Save Point Values", use_container_width=True):
+            commit_edit(store, {"op": "set_point_table", "from": effective_week, "points": new_points})
+            st.success(f"Point values updated from week of {effective_week}")
+            st.rerun()
+
+with tab4, span("Import / Export tab"):
+    st.subheader("Import Activity")
+    st.caption(
+        "CSV or Parquet with columns week, member, category, count. "
+        "Each count replaces the stored value for that week, member and category."
+    )
+    uploaded = st.file_uploader("Activity file", type=["csv", "parquet"])
+    if uploaded:
+        # The reviewed dry run is kept so Import commits exactly those edits and
+        # their bases, rather than a plan re-read against whatever is stored by then.
+        plan_key = f"import_{store['league']['slug']}_{uploaded.file_id}"
+        try:
+            if plan_key not in st.session_state:
+                st.session_state[plan_key] = plan_import(data, read_activity_file(uploaded))
+            edits, diff, errors = st.session_state[plan_key]
+        except ValueError as e:
+            st.error(str(e))
+        else:
+            if len(errors):
+                st.error(f"{len(errors):,} rows failed validation. Fix them and upload again.")
+                st.dataframe(errors, hide_index=True, use_container_width=True)
+            elif not edits:
+                st.info("Nothing to change. The file matches the stored data.")
+            else:
+                st.markdown(f"**Dry run:** {len(diff):,} counts change across {len(edits):,} member-weeks")
+                st.dataframe(diff, hide_index=True, use_container_width=True)
+                if st.button("Import", type="primary", use_container_width=True):
+                    conflicts = commit_edits(store, edits, session_id())
+                    del st.session_state[plan_key]
+                    if conflicts:
+                        st.warning(
+                            f"{len(conflicts):,} member-weeks changed since this file was checked and were skipped: "
+                            + ", ".join(f"{edit['member']} ({edit['week']})" for edit in conflicts)
+                            + ". Upload the file again to review them."
+                        )
+                    else:
+                        st.success(f"Imported {len(diff):,} counts")
+                        st.rerun()
+    
+    st.divider()
+    st.subheader("Export Activity")
+    col1, col2 = st.columns(2)
+    with col1:
+        st.download_button(
+            "Download CSV",
+            data=lambda: export_store(store, "csv"),
+            file_name="march_bradness_activity.csv",
+            mime="text/csv",
+            use_container_width=True,
+        )
+    with col2:
+        st.download_button(
+            "Download Parquet",
+            data=lambda: export_store(store, "parquet"),
+            file_name="march_bradness_activity.parquet",
+            mime="application/octet-stream",
+            use_container_width=True,
+        )
+
+with tab5, span("History tab"):
+    st.subheader("Recent Changes")
+    events = get_recent_events(store)
+    if not events:
+        st.info("No changes recorded yet.")
+    else:
+        st.dataframe(
+            pd.DataFrame([
+                {
+                    "When": parse_event_time(edit["at"]).astimezone().strftime("%Y-%m-%d %H:%M:%S") if edit.get("at") else "",
+                    "Session": (edit.get("session") or "")[:8],
+                    "Change": describe_edit(edit),
+                }
+                for edit in events
+            ]),
+            hide_index=True,
+            use_container_width=True,
+        )
+    
+    st.divider()
+    st.subheader("Standings at a Point in Time")
+    with st.form("point_in_time_form"):
+        col1, col2 = st.columns(2)
+        with col1:
+            as_of_day = st.date_input("Date", value=datetime.now())
+        with col2:
+            as_of_time = st.time_input("Time", value=datetime.now().time().replace(second=0, microsecond=0))
+        show_as_of = st.form_submit_button("Show Standings", use_container_width=True)
+    if show_as_of:
+        # The picker is per minute; include everything up to the end of that minute.
+        moment = datetime.combine(as_of_day, as_of_time).astimezone() + timedelta(minutes=1, microseconds=-1)
+        with locked(store["league"], shared=True):
+            obj, replayed = load_json_at(store["league"], moment)
+        board = json_leaderboard(obj, store["league"]["points"])
+        st.caption(f"As of {moment:%Y-%m-%d %H:%M}, rebuilt from the nearest checkpoint and {replayed:,} later changes.")
+        st.dataframe(
+            pd.DataFrame(
+                [{"Rank": rank, "Member": member, "Points": points} for rank, (member, points) in enumerate(board.items(), 1)]
+            ),
+            hide_index=True,
+            use_container_width=True,
+        )
+
+if profile is not None:
+    render_profile(finish_profile(profile))
@@ -0,0 +1,404 @@
+import base64
+import json
+import logging
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+from pathlib import Path
+
+logging.getLogger("streamlit").setLevel(logging.ERROR)
+
+import bradness
+from bradness import CATEGORIES
+
+SUITE_REPEAT = 5
+
+
+def make_data(n_members, n_weeks, sparsity=0.0, seed=0):
+    # sparsity is the share of member-weeks with no record at all, as when
+    # someone logs nothing that week. The same arguments give the same season.
+    rng = random.Random(seed)
+    members = [f"Member {i}" for i in range(n_members)]
+    start = date(2026, 1, 5)
+    weekly_data = {}
+    for w in range(n_weeks):
+        week_key = (start + timedelta(weeks=w)).strftime("%Y-%m-%d")
+        weekly_data[week_key] = {
+            member: {cat: rng.choice([0, 0, 0, 1, 2, 3]) for cat in CATEGORIES}
+            for member in members
+            if rng.random() >= sparsity
+        }
+    return {"team_members": members, "weekly_data": weekly_data}
+
+
+# The per-member dict loops the scoring engine replaced, kept as the baseline.
+def loop_leaderboard(data):
+    scores = {}
+    for member in data["team_members"]:
+        total = 0
+        for week_key, week_data in data["weekly_data"].items():
+            if member in week_data:
+                total += bradness.calculate_points(week_data[member])
+        scores[member] = total
+    return dict(sorted(scores.items(), key=lambda x: x[1], reverse=True))
+
+
+def loop_member_breakdown(data, member):
+    breakdown = {cat: 0 for cat in CATEGORIES}
+    for week_key, week_data in data["weekly_data"].items():
+        if member in week_data:
+            for cat, count in week_data[member].items():
+                if cat in breakdown:
+                    breakdown[cat] += count
+    return breakdown
+
+
+def loop_member_weekly_points(data, member):
+    weekly = {}
+    for week_key, week_data in data["weekly_data"].items():
+        if member in week_data:
+            pts = bradness.calculate_points(week_data[member])
+            if pts > 0:
+                weekly[week_key] = pts
+    return dict(sorted(weekly.items()))
+
+
+def loop_rerun(data):
+    # What one render of the Standings view costs: the board plus every expander.
+    leaderboard = loop_leaderboard(data)
+    for member in leaderboard:
+        loop_member_breakdown(data, member)
+        loop_member_weekly_points(data, member)
+
+
+def engine_rerun(agg):
+    leaderboard = bradness.get_leaderboard(agg)
+    for member in leaderboard:
+        bradness.get_member_breakdown(agg, member)
+        bradness.get_member_weekly_points(agg, member)
+
+
+def engine_edit(store):
+    # A whole save as the app makes it: lock, catch up, copy, append and apply.
+    season = store["data"]
+    week_key = max(season.week_keys)
+    member = season.members[0]
+    counts = season.get_counts(week_key, member)
+    counts["Go-Lives"] = counts.get("Go-Lives", 0) + 1
+    edit = {"op": "set_points", "week": week_key, "member": member, "counts": counts, "base": season.version(week_key, member)}
+    assert not bradness.commit_edits(store, [edit])
+
+
+def retained_bytes(build):
+    tracemalloc.start()
+    kept = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return size
+
+
+def scratch_league():
+    return bradness.make_league("bench", "Benchmark", CATEGORIES, Path(tempfile.mkdtemp()) / "data.json")
+
+
+def store_edit(league, season):
+    week_key = max(season.week_keys)
+    member = season.members[0]
+    bradness.append_edits(league, [{"op": "set_points", "week": week_key, "member": member, "counts": season.get_counts(week_key, member)}])
+
+
+def asset_payload():
+    # Importing app runs the page once in bare mode, which leaves Streamlit's
+    # layout state behind, so only the report that needs it imports it.
+    import app
+
+    def encoded(path):
+        return len(base64.b64encode(path.read_bytes()))
+
+    app.build_assets()
+    legacy = encoded(app.LOGO_FILE) + encoded(app.SNOWFLAKE_ICON_FILE)
+    inline = encoded(app.STATIC_DIR / "logo.webp") + encoded(app.STATIC_DIR / "snowflake_icon.webp")
+    static = len(app.header_html({"logo": "app/static/logo.webp?v=0", "pattern": "url('app/static/snowflake_icon.webp?v=0')"}))
+    print("Header payload per rerun")
+    print(f"  inline PNG (before):   {legacy / 1024:>8.1f} KB, +{encoded(app.BANG_SOUND_FILE) / 1024:.1f} KB MP3 after a save")
+    print(f"  inline WebP fallback:  {inline / 1024:>8.1f} KB")
+    print(f"  static serving:        {static / 1024:>8.1f} KB, MP3 by media URL")
+    print()
+
+
+def cli_startup():
+    # Fresh interpreters, as cron or a chat bot would run it.
+    script = Path(__file__).parent / "bradness.py"
+    times = []
+    for _ in range(5):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, str(script), "standings"], check=True, capture_output=True)
+        times.append(time.perf_counter() - start)
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "import numpy"], check=True)
+    numpy_only = time.perf_counter() - start
+    print("Cold start")
+    print(f"  bradness.py standings: {min(times) * 1000:>8.1f} ms")
+    print(f"  python -c 'import numpy': {numpy_only * 1000:>5.1f} ms")
+    print()
+
+
+def timed(fn, *args, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(sizes):
+    asset_payload()
+    cli_startup()
+    league = scratch_league()
+    print(
+        f"{'members':>8} {'weeks':>6} {'loops ms':>10} {'build ms':>10} {'rerun ms':>10} "
+        f"{'edit us':>9} {'speedup':>8} {'rewrite ms':>11} {'append ms':>10} {'load ms':>8} "
+        f"{'dict B/mw':>10} {'cols B/mw':>10}"
+    )
+    for n_members, n_weeks in sizes:
+        data = make_data(n_members, n_weeks)
+        text = json.dumps(data)
+        season = bradness.Season.from_json(data)
+        agg = bradness.build_aggregates(season)
+        assert bradness.get_leaderboard(agg) == loop_leaderboard(data)
+        loops = timed(loop_rerun, data)
+        build = timed(bradness.build_aggregates, season)
+        rerun = timed(engine_rerun, agg)
+        league["log_file"].unlink(missing_ok=True)
+        bradness.save_data(league, season)
+        store = bradness.load_store(league)
+        edit = timed(engine_edit, store)
+        assert bradness.get_leaderboard(store["aggregates"]) == loop_leaderboard(store["data"].to_json())
+        league["log_file"].unlink(missing_ok=True)
+        rewrite = timed(bradness.save_data, league, season)
+        append = timed(store_edit, league, season)
+        load = timed(bradness.load_data, league)
+        member_weeks = n_members * n_weeks
+        dict_bytes = retained_bytes(lambda: json.loads(text)) / member_weeks
+        column_bytes = retained_bytes(lambda: bradness.Season.from_json(json.loads(text))) / member_weeks
+        print(
+            f"{n_members:>8} {n_weeks:>6} {loops * 1000:>10.1f} {build * 1000:>10.1f} "
+            f"{rerun * 1000:>10.1f} {edit * 1e6:>9.0f} {loops / rerun:>7.1f}x "
+            f"{rewrite * 1000:>11.1f} {append * 1000:>10.2f} {load * 1000:>8.1f} "
+            f"{dict_bytes:>10.0f} {column_bytes:>10.0f}"
+        )
+
+
+def peak_bytes(fn, *args):
+    tracemalloc.start()
+    fn(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def all_weeks(agg):
+    # What the Leaderboard tab pays after an edit: rebuild the timeline, then read it.
+    return bradness.get_all_weeks(bradness.build_timeline(agg))
+
+
+def all_breakdowns(agg):
+    for member in agg["ids"]:
+        bradness.get_member_breakdown(agg, member)
+
+
+def app_rerun(at):
+    at.run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+
+
+def suite_case(n_members, n_weeks, sparsity):
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+
+    league = scratch_league()
+    bradness.write_snapshot(league, make_data(n_members, n_weeks, sparsity))
+    season = bradness.load_data(league)
+    agg = bradness.build_aggregates(season)
+    cases = {
+        "get_leaderboard": (bradness.get_leaderboard, agg),
+        "get_all_weeks": (all_weeks, agg),
+        "get_member_breakdown": (all_breakdowns, agg),
+        "save_data": (bradness.save_data, league, season),
+        "load_data": (bradness.load_data, league),
+    }
+    results = {}
+    for name, (fn, *args) in cases.items():
+        results[f"{name} ms"] = timed(fn, *args, repeat=SUITE_REPEAT) * 1000
+        results[f"{name} peak KB"] = peak_bytes(fn, *args) / 1024
+
+    # Full script runs of app.py against the synthetic season: the first loads
+    # the store, later ones are the reruns every widget interaction triggers.
+    data_file = bradness.DATA_FILE
+    bradness.DATA_FILE = league["data_file"]
+    try:
+        st.cache_resource.clear()
+        at = AppTest.from_file(str(Path(__file__).parent / "app.py"), default_timeout=600)
+        results["app first run ms"] = timed(app_rerun, at, repeat=1) * 1000
+        results["app rerun ms"] = timed(app_rerun, at, repeat=SUITE_REPEAT) * 1000
+        results["app rerun peak KB"] = peak_bytes(app_rerun, at) / 1024
+    finally:
+        bradness.DATA_FILE = data_file
+        st.cache_resource.clear()
+    return results
+
+
+def editing_session(store, seed, n_edits, cells):
+    # One browser session: read a cell, change a count, save against the version read.
+    rng = random.Random(seed)
+    saved = conflicts = 0
+    for _ in range(n_edits):
+        week_key, member = rng.choice(cells)
+        base = store["data"].version(week_key, member)
+        counts = store["data"].get_counts(week_key, member)
+        counts["Go-Lives"] = counts.get("Go-Lives", 0) + 1
+        edit = {"op": "set_points", "week": week_key, "member": member, "counts": counts, "base": base}
+        if bradness.commit_edits(store, [edit]):
+            conflicts += 1
+        else:
+            saved += 1
+    return saved, conflicts
+
+
+def editing_process(league, seed, n_sessions, n_edits, cells):
+    # One server process, with its own store shared by its sessions.
+    from concurrent.futures import ThreadPoolExecutor
+
+    store = bradness.load_store(league)
+    with ThreadPoolExecutor(n_sessions) as pool:
+        results = list(pool.map(lambda i: editing_session(store, seed * 1000 + i, n_edits, cells), range(n_sessions)))
+    return [sum(counts) for counts in zip(*results)]
+
+
+def load_test(n_processes, n_sessions, n_edits, n_members=100, n_weeks=13, hot_cells=50):
+    # Sessions in several processes edit a small pool of cells, so some saves
+    # race on the same cell. Every save must either land or come back as a conflict.
+    from concurrent.futures import ProcessPoolExecutor
+
+    league = scratch_league()
+    data = make_data(n_members, n_weeks)
+    bradness.write_snapshot(league, data)
+    rng = random.Random(0)
+    cells = [(rng.choice(list(data["weekly_data"])), rng.choice(data["team_members"])) for _ in range(hot_cells)]
+    start = time.perf_counter()
+    with ProcessPoolExecutor(n_processes) as pool:
+        results = list(pool.map(editing_process, [league] * n_processes, range(n_processes), [n_sessions] * n_processes, [n_edits] * n_processes, [cells] * n_processes))
+    elapsed = time.perf_counter() - start
+    saved, conflicts = (sum(counts) for counts in zip(*results))
+    season = bradness.load_data(league)
+    assert saved + conflicts == n_processes * n_sessions * n_edits
+    assert int(season.versions.sum()) == saved, "a save was lost"
+    print(f"Concurrent editing: {n_processes} processes x {n_sessions} sessions x {n_edits} saves on {hot_cells} cells")
+    print(f"  {saved:,} saved, {conflicts:,} conflicts reported, {(saved + conflicts) / elapsed:,.0f} saves/s, none lost")
+
+
+def api_polls(n_members=250, n_weeks=52, n_polls=2000):
+    # Drives the ASGI app in process, so this is the app's own cost per poll on
+    # one core, without the HTTP server in front of it.
+    import asyncio
+
+    import api
+
+    league = scratch_league()
+    bradness.write_snapshot(league, make_data(n_members, n_weeks))
+    api.registry["stores"]["bench"] = bradness.load_store(league)
+    path = "/leagues/bench/leaderboard"
+
+    async def poll(headers=()):
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        await api.app({"type": "http", "method": "GET", "path": path, "query_string": b"", "headers": list(headers)}, None, send)
+        return sent
+
+    async def run():
+        etag = dict((await poll())[0]["headers"])[b"etag"]
+        rates = {}
+        for name, headers in [("304 unchanged", [(b"if-none-match", etag)]), ("200 cached body", [])]:
+            start = time.perf_counter()
+            for _ in range(n_polls):
+                await poll(headers)
+            rates[name] = n_polls / (time.perf_counter() - start)
+        start = time.perf_counter()
+        for _ in range(n_polls // 20):
+            store_edit(league, api.registry["stores"]["bench"]["data"])
+            await poll([(b"if-none-match", etag)])
+        rates["200 after a save"] = (n_polls // 20) / (time.perf_counter() - start)
+        return rates
+
+    print(f"API polls of {path}, {n_members} members x {n_weeks} weeks, one core")
+    for name, rate in asyncio.run(run()).items():
+        print(f"  {name:<18} {rate:>10,.0f} polls/s")
+
+
+def regressions(results, baseline, threshold):
+    # Tiny timings are mostly noise, so a slowdown must also clear an absolute floor.
+    failures = []
+    for case, metrics in results.items():
+        for metric, value in metrics.items():
+            before = baseline.get(case, {}).get(metric)
+            floor = 1.0 if metric.endswith("ms") else 64.0
+            if before is not None and value > before * (1 + threshold) and value - before > floor:
+                failures.append(f"{case} {metric}: {before:,.1f} -> {value:,.1f}")
+    return failures
+
+
+def suite(sizes, sparsity, baseline_file, threshold, save_baseline):
+    results = {}
+    for n_members, n_weeks in sizes:
+        case = f"{n_members}x{n_weeks} sparsity {sparsity:g}"
+        results[case] = suite_case(n_members, n_weeks, sparsity)
+        print(case)
+        for metric, value in results[case].items():
+            print(f"  {metric:<30} {value:>12,.2f}")
+    if save_baseline:
+        baseline_file.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"Saved baseline to {baseline_file}")
+        return 0
+    if not baseline_file.exists():
+        print(f"No baseline at {baseline_file}; run with --save-baseline first.")
+        return 0
+    failures = regressions(results, json.loads(baseline_file.read_text()), threshold)
+    for failure in failures:
+        print(f"REGRESSION {failure}")
+    if not failures:
+        print(f"No regressions past {threshold:.0%} of {baseline_file}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Time the scoring engine and app reruns on synthetic seasons.")
+    parser.add_argument("sizes", nargs="*", help="MEMBERSxWEEKS, e.g. 250x52")
+    parser.add_argument("--suite", action="store_true", help="time each leaderboard path and check against a baseline")
+    parser.add_argument("--sparsity", type=float, default=0.0, help="share of member-weeks with no record")
+    parser.add_argument("--baseline", type=Path, default=Path(__file__).parent / "benchmark_baseline.json")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown or memory growth, 0.25 = 25%%")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--load-test", metavar="PxSxE", help="P processes x S sessions each x E saves per session")
+    parser.add_argument("--api", action="store_true", help="poll throughput of the JSON API")
+    args = parser.parse_args()
+    sizes = [tuple(int(x) for x in arg.split("x")) for arg in args.sizes]
+    if args.api:
+        api_polls(*(sizes[0] if sizes else ()))
+    elif args.load_test:
+        load_test(*(int(x) for x in args.load_test.split("x")))
+    elif args.suite:
+        sys.exit(suite(sizes or [(6, 2), (100, 26), (500, 52)], args.sparsity, args.baseline, args.threshold, args.save_baseline))
+    else:
+        main(sizes or [(6, 2), (50, 13), (100, 26), (250, 52), (500, 52)])
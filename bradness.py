@@ -0,0 +1,1292 @@
+import bisect
+import csv
+import fcntl
+import importlib.util
+import io
+import itertools
+import json
+import os
+import sys
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+
+def lazy_import(name):
+    # numpy and pandas cost more to import than a CLI run takes, so they load on
+    # first attribute access. Anything already imported is used as is.
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+CATEGORIES = {
+    "Summit Registrants": 5,
+    "CoCo App Creation": 30,
+    "In-Person Meetings": 30,
+    "Hands On Labs": 50,
+    "CECs": 50,
+    "Implementation Starts": 50,
+    "New POCs Started": 80,
+    "Technical Wins": 160,
+    "Go-Lives": 160,
+}
+
+DATA_FILE = Path(__file__).parent / "march_bradness_data.json"
+ACTIVITY_COLUMNS = ["week", "member", "category", "count"]
+EXPORT_BATCH_ROWS = 10_000
+COMPACT_BYTES = 256 * 1024
+LEAGUE_MEMORY_BUDGET = 256 * 1024 * 1024
+SIZE_SAMPLE_AFTER = 64
+LEAGUES_DIR = Path(__file__).parent / "leagues"
+DEFAULT_LEAGUE = "march-bradness"
+
+
+class Season:
+    # Columnar store for one season. Members and weeks are interned to integer ids,
+    # each stored member-week is one row of int32 counts (one column per category),
+    # and a dense (week id x member id) index maps cells to rows, -1 where empty.
+    # A matching dense array holds each cell's edit version, kept even when the
+    # cell's counts go back to zero.
+    __slots__ = (
+        "points",
+        "categories",
+        "weights",
+        "schedule",
+        "member_names",
+        "member_ids",
+        "roster",
+        "week_keys",
+        "week_ids",
+        "index",
+        "versions",
+        "counts",
+        "size",
+    )
+
+    def __init__(self, points):
+        self.points = dict(points)
+        self.categories = list(self.points)
+        self.weights = np.array(list(self.points.values()), dtype=np.int64)
+        # Point tables sorted by the week they take effect; the league's own table
+        # is version 0 and applies from the start ("" sorts before any week key).
+        self.schedule = [{"from": "", "version": 0, "points": self.points, "weights": self.weights}]
+        self.member_names = []
+        self.member_ids = {}
+        self.roster = []
+        self.week_keys = []
+        self.week_ids = {}
+        self.index = np.full((0, 0), -1, dtype=np.int32)
+        self.versions = np.zeros((0, 0), dtype=np.int32)
+        self.counts = np.zeros((0, len(self.categories)), dtype=np.int32)
+        self.size = 0
+
+    @classmethod
+    def from_json(cls, obj, points=CATEGORIES):
+        season = cls(points)
+        for name in obj.get("team_members", []):
+            season.add_member(name)
+        weeks, members, values = [], [], []
+        for week_key, week_data in obj.get("weekly_data", {}).items():
+            w = season.week_id(week_key)
+            for name, activities in week_data.items():
+                m = season.member_ids.get(name)
+                row = [activities.get(cat, 0) for cat in season.categories]
+                if m is not None and any(row):
+                    weeks.append(w)
+                    members.append(m)
+                    values.append(row)
+        season.index = np.full((len(season.week_keys), len(season.member_names)), -1, dtype=np.int32)
+        season.index[weeks, members] = np.arange(len(values), dtype=np.int32)
+        season.counts = np.array(values, dtype=np.int32).reshape(-1, len(season.categories))
+        season.size = len(values)
+        season.versions = np.zeros(season.index.shape, dtype=np.int32)
+        for week_key, week_versions in obj.get("versions", {}).items():
+            for name, version in week_versions.items():
+                if name in season.member_ids:
+                    # week_id may grow the arrays, so intern before indexing.
+                    w = season.week_id(week_key)
+                    season.versions[w, season.member_ids[name]] = version
+        for table in obj.get("point_schedule", []):
+            season.set_point_table(table["from"], table["points"])
+        return season
+
+    def to_json(self):
+        weekly_data = {}
+        for w, week_key in enumerate(self.week_keys):
+            for m in np.flatnonzero(self.index[w] >= 0):
+                counts = self.counts[self.index[w, m]].tolist()
+                weekly_data.setdefault(week_key, {})[self.member_names[m]] = sparse_counts(dict(zip(self.categories, counts)))
+        versions = {}
+        for w, m in zip(*np.nonzero(self.versions)):
+            versions.setdefault(self.week_keys[w], {})[self.member_names[m]] = int(self.versions[w, m])
+        obj = {"team_members": self.members, "weekly_data": weekly_data, "versions": versions}
+        if len(self.schedule) > 1:
+            obj["point_schedule"] = [{"from": table["from"], "points": table["points"]} for table in self.schedule[1:]]
+        return obj
+
+    @property
+    def members(self):
+        return [self.member_names[m] for m in self.roster]
+
+    def table_for(self, week_key):
+        return self.schedule[bisect.bisect_right([table["from"] for table in self.schedule], week_key) - 1]
+
+    def set_point_table(self, from_week, points):
+        # Tables are never edited in place: a new version replaces any table
+        # starting the same week, so weeks scored under other tables stay put.
+        table = {cat: int(points.get(cat, self.points[cat])) for cat in self.categories}
+        entry = {
+            "from": from_week,
+            "version": max(t["version"] for t in self.schedule) + 1,
+            "points": table,
+            "weights": np.array(list(table.values()), dtype=np.int64),
+        }
+        starts = [t["from"] for t in self.schedule]
+        i = bisect.bisect_left(starts, from_week)
+        if i < len(starts) and starts[i] == from_week:
+            self.schedule[i] = entry
+        else:
+            self.schedule.insert(i, entry)
+
+    def week_id(self, week_key):
+        w = self.week_ids.get(week_key)
+        if w is None:
+            w = self.week_ids[week_key] = len(self.week_keys)
+            self.week_keys.append(week_key)
+            self._grow_index()
+        return w
+
+    def _grow_index(self):
+        n_weeks, n_members = self.index.shape
+        if len(self.week_keys) <= n_weeks and len(self.member_names) <= n_members:
+            return
+        shape = (max(n_weeks, len(self.week_keys) * 2), max(n_members, len(self.member_names) * 2))
+        index = np.full(shape, -1, dtype=np.int32)
+        index[:n_weeks, :n_members] = self.index
+        self.index = index
+        versions = np.zeros(shape, dtype=np.int32)
+        versions[:n_weeks, :n_members] = self.versions
+        self.versions = versions
+
+    def get_counts(self, week_key, name):
+        m = self.member_ids.get(name)
+        w = self.week_ids.get(week_key)
+        if m is None or w is None or self.index[w, m] < 0:
+            return {}
+        return sparse_counts(dict(zip(self.categories, self.counts[self.index[w, m]].tolist())))
+
+    def version(self, week_key, name):
+        m = self.member_ids.get(name)
+        w = self.week_ids.get(week_key)
+        if m is None or w is None:
+            return 0
+        return int(self.versions[w, m])
+
+    def set_version(self, week_key, name, version):
+        w = self.week_id(week_key)
+        self.versions[w, self.member_ids[name]] = version
+
+    def set_counts(self, week_key, name, activities):
+        # Only member-weeks with activity get a row; setting all zeros drops it.
+        m = self.member_ids[name]
+        if not any(activities.get(cat, 0) for cat in self.categories):
+            w = self.week_ids.get(week_key)
+            if w is not None and self.index[w, m] >= 0:
+                self._drop_row(w, m)
+            return
+        w = self.week_id(week_key)
+        row = self.index[w, m]
+        if row < 0:
+            row = self.index[w, m] = self.size
+            if row == len(self.counts):
+                self.counts = np.resize(self.counts, (max(16, row * 2), len(self.categories)))
+            self.size += 1
+        self.counts[row] = [activities.get(cat, 0) for cat in self.categories]
+
+    def _drop_row(self, w, m):
+        # The last row moves into the hole so stored rows stay contiguous.
+        row, last = self.index[w, m], self.size - 1
+        self.index[w, m] = -1
+        if row != last:
+            self.counts[row] = self.counts[last]
+            self.index[self.index == last] = row
+        self.size -= 1
+
+    def add_member(self, name):
+        m = self.member_ids[name] = len(self.member_names)
+        self.member_names.append(name)
+        self.roster.append(m)
+        self._grow_index()
+
+    def rename_member(self, old_name, new_name):
+        m = self.member_ids.pop(old_name)
+        self.member_ids[new_name] = m
+        self.member_names[m] = new_name
+
+    def remove_member(self, name):
+        m = self.member_ids.pop(name)
+        self.member_names[m] = None
+        self.roster.remove(m)
+        keep = np.ones(self.size, dtype=bool)
+        keep[self.index[:, m][self.index[:, m] >= 0]] = False
+        self.index[:, m] = -1
+        self.versions[:, m] = 0
+        new_rows = np.cumsum(keep, dtype=np.int32) - 1
+        stored = self.index >= 0
+        self.index[stored] = new_rows[self.index[stored]]
+        self.counts = self.counts[: self.size][keep]
+        self.size = len(self.counts)
+
+    def nbytes(self):
+        return self.index.nbytes + self.versions.nbytes + self.counts.nbytes
+
+    def copy(self, arrays=True):
+        # Shares only what is never changed in place: the league's points, the
+        # category list and the point tables themselves. With arrays=False the
+        # index, versions and counts are shared too. Cell writes then land in
+        # both, but readers of either still see a cell's old or new counts and
+        # never a dangling row; only remove_member renumbers rows and needs them.
+        season = Season.__new__(Season)
+        season.points = self.points
+        season.categories = self.categories
+        season.weights = self.weights
+        season.schedule = list(self.schedule)
+        season.member_names = list(self.member_names)
+        season.member_ids = dict(self.member_ids)
+        season.roster = list(self.roster)
+        season.week_keys = list(self.week_keys)
+        season.week_ids = dict(self.week_ids)
+        if arrays:
+            season.index = self.index.copy()
+            season.versions = self.versions.copy()
+            season.counts = self.counts[: self.size].copy()
+        else:
+            season.index, season.versions, season.counts = self.index, self.versions, self.counts
+        season.size = self.size
+        return season
+
+
+def make_league(slug, name, points, data_file):
+    return {
+        "slug": slug,
+        "name": name,
+        "points": points,
+        "data_file": data_file,
+        "log_file": data_file.with_suffix(".log.jsonl"),
+        "compacting_file": data_file.with_suffix(".compacting.jsonl"),
+        "lock_file": data_file.with_suffix(".lock"),
+        "history_dir": data_file.with_suffix(".history"),
+    }
+
+
+def list_leagues():
+    # Reads only each league's small config file, never its data.
+    leagues = {DEFAULT_LEAGUE: make_league(DEFAULT_LEAGUE, "March Bradness", CATEGORIES, DATA_FILE)}
+    for config_file in sorted(LEAGUES_DIR.glob("*/league.json")):
+        with open(config_file, "r") as f:
+            config = json.load(f)
+        slug = config_file.parent.name
+        leagues[slug] = make_league(slug, config.get("name", slug), config.get("points", CATEGORIES), config_file.parent / "data.json")
+    return leagues
+
+
+def sparse_counts(activities):
+    return {cat: count for cat, count in activities.items() if count}
+
+
+def sparsify(obj):
+    # Missing means zero: drop zero counts and the member-weeks and weeks they empty.
+    weekly_data = {}
+    for week_key, week_data in obj.get("weekly_data", {}).items():
+        week_data = {name: counts for name, activities in week_data.items() if (counts := sparse_counts(activities))}
+        if week_data:
+            weekly_data[week_key] = week_data
+    return {**obj, "weekly_data": weekly_data, "sparse": True}
+
+
+def read_snapshot(league):
+    if league["data_file"].exists():
+        with open(league["data_file"], "r") as f:
+            return json.load(f)
+    return {"team_members": [], "weekly_data": {}}
+
+
+def read_log(path, offset=0):
+    if not path.exists():
+        return
+    with open(path, "r") as f:
+        f.seek(offset)
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                # A torn line from a crash mid-append. append_edits starts the
+                # next write on a fresh line, so edits after it still stand.
+                continue
+
+
+def replay_edit(obj, edit):
+    # apply_edit for the plain JSON form, with the same guards, so the log can be
+    # folded in without building a Season.
+    op = edit["op"]
+    members = obj.setdefault("team_members", [])
+    weekly_data = obj.setdefault("weekly_data", {})
+    versions = obj.setdefault("versions", {})
+    if op == "set_points":
+        if edit["member"] in members:
+            week_versions = versions.setdefault(edit["week"], {})
+            week_versions[edit["member"]] = edit.get("version", week_versions.get(edit["member"], 0) + 1)
+            week_data = weekly_data.setdefault(edit["week"], {})
+            counts = sparse_counts(edit["counts"])
+            if counts:
+                week_data[edit["member"]] = counts
+            else:
+                week_data.pop(edit["member"], None)
+                if not week_data:
+                    del weekly_data[edit["week"]]
+    elif op == "add_member":
+        if edit["member"] not in members:
+            members.append(edit["member"])
+    elif op == "rename_member":
+        old_name, new_name = edit["member"], edit["new_name"]
+        if old_name in members and new_name not in members:
+            members[members.index(old_name)] = new_name
+            for table in (weekly_data, versions):
+                for week_key, week_data in table.items():
+                    if old_name in week_data:
+                        table[week_key] = {new_name if name == old_name else name: v for name, v in week_data.items()}
+    elif op == "remove_member":
+        if edit["member"] in members:
+            members.remove(edit["member"])
+            for week_data in itertools.chain(weekly_data.values(), versions.values()):
+                week_data.pop(edit["member"], None)
+    elif op == "set_point_table":
+        schedule = [t for t in obj.get("point_schedule", []) if t["from"] != edit["from"]]
+        schedule.append({"from": edit["from"], "points": dict(edit["points"])})
+        obj["point_schedule"] = sorted(schedule, key=lambda t: t["from"])
+    else:
+        raise ValueError(f"Unknown edit: {op}")
+
+
+def load_json(league):
+    obj = read_snapshot(league)
+    for path in (league["compacting_file"], league["log_file"]):
+        for edit in read_log(path):
+            replay_edit(obj, edit)
+    return obj
+
+
+def load_data(league):
+    obj = load_json(league)
+    if league["data_file"].exists() and not obj.get("sparse"):
+        # One-time migration of a snapshot written with zero-filled records.
+        compact(league)
+    return Season.from_json(obj, league["points"])
+
+
+def write_snapshot(league, obj):
+    tmp_file = league["data_file"].with_name(league["data_file"].name + ".tmp")
+    with open(tmp_file, "w") as f:
+        json.dump(sparsify(obj), f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_file, league["data_file"])
+
+
+def save_data(league, data):
+    write_snapshot(league, data.to_json())
+
+
+def append_edits(league, edits):
+    # One write and one fsync however many edits there are. A torn last line
+    # from a crash mid-append is ended rather than cut off, so the log only
+    # grows and readers' offsets into it stay valid.
+    lines = "".join(json.dumps(edit) + "\n" for edit in edits).encode()
+    with open(league["log_file"], "ab+") as f:
+        if f.seek(0, os.SEEK_END):
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                lines = b"\n" + lines
+        f.write(lines)
+        f.flush()
+        os.fsync(f.fileno())
+    if league["log_file"].stat().st_size > COMPACT_BYTES:
+        compact(league)
+
+
+def compact(league):
+    # Move the log aside first so new appends start a fresh one while we fold it in.
+    if league["log_file"].exists() and not league["compacting_file"].exists():
+        os.replace(league["log_file"], league["compacting_file"])
+    obj = read_snapshot(league)
+    events = list(read_log(league["compacting_file"]))
+    if events:
+        archive_base(league, obj)
+    for edit in events:
+        replay_edit(obj, edit)
+    write_snapshot(league, obj)
+    if events:
+        archive_segment(league, obj, events)
+    league["compacting_file"].unlink(missing_ok=True)
+
+
+def event_time(moment=None):
+    # Fixed-width UTC, so event times and history file names sort as strings.
+    return (moment or datetime.now(timezone.utc)).astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+def write_json(path, obj):
+    tmp_file = path.with_name(path.name + ".tmp")
+    with open(tmp_file, "w") as f:
+        json.dump(obj, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_file, path)
+
+
+def archive_base(league, obj):
+    # The state before the first archived event, so replay can reach back to it.
+    base = league["history_dir"] / "base.json"
+    if not base.exists():
+        league["history_dir"].mkdir(exist_ok=True)
+        write_json(base, sparsify(obj))
+
+
+def archive_segment(league, obj, events):
+    # Every compacted log is kept as a history segment, named by its last event
+    # time, next to a checkpoint of the state it leaves behind. Replaying to any
+    # moment then starts from the nearest checkpoint and reads at most one
+    # segment. Redoing a crashed compaction rewrites the same two files.
+    name = (events[-1].get("at") or event_time()).replace(":", "")
+    write_json(league["history_dir"] / f"{name}.json", sparsify(obj))
+    os.replace(league["compacting_file"], league["history_dir"] / f"{name}.jsonl")
+
+
+def history_segments(league):
+    if not league["history_dir"].exists():
+        return []
+    return sorted(league["history_dir"].glob("*.jsonl"))
+
+
+def iter_events(league, segments=None):
+    # Archived segments, then the log being compacted, then the live log.
+    for path in [*(history_segments(league) if segments is None else segments), league["compacting_file"], league["log_file"]]:
+        yield from read_log(path)
+
+
+def load_json_at(league, moment):
+    # The league as it stood at `moment`: the newest checkpoint at or before
+    # it plus the events that followed, up to `moment`. Returns the JSON form
+    # and how many events were replayed.
+    at = event_time(moment)
+    segments = history_segments(league)
+    done = [path for path in segments if path.stem <= at.replace(":", "")]
+    if done:
+        with open(done[-1].with_suffix(".json"), "r") as f:
+            obj = json.load(f)
+    elif segments:
+        with open(league["history_dir"] / "base.json", "r") as f:
+            obj = json.load(f)
+    else:
+        obj = read_snapshot(league)
+    replayed = 0
+    for edit in iter_events(league, segments[len(done):]):
+        # Edits logged before events were timestamped count as already made.
+        if edit.get("at", "") > at:
+            break
+        replay_edit(obj, edit)
+        replayed += 1
+    return obj, replayed
+
+
+def parse_event_time(at):
+    return datetime.strptime(at, "%Y-%m-%dT%H:%M:%S.%fZ").replace(tzinfo=timezone.utc)
+
+
+def describe_edit(edit):
+    op = edit["op"]
+    if op == "set_points":
+        counts = ", ".join(f"{cat} {count}" for cat, count in sparse_counts(edit["counts"]).items()) or "cleared"
+        return f"{edit['member']}, week of {edit['week']}: {counts}"
+    if op == "add_member":
+        return f"Added {edit['member']}"
+    if op == "rename_member":
+        return f"Renamed {edit['member']} to {edit['new_name']}"
+    if op == "remove_member":
+        return f"Removed {edit['member']}"
+    if op == "set_point_table":
+        return f"Point values from week of {edit['from']}: " + ", ".join(f"{cat} {pts}" for cat, pts in edit["points"].items())
+    return op
+
+
+def recent_events(league, n):
+    # The newest n events, newest first, reading segments back only as far as needed.
+    paths = [league["log_file"], league["compacting_file"], *reversed(history_segments(league))]
+    events = []
+    for path in paths:
+        events += list(read_log(path))[::-1]
+        if len(events) >= n:
+            break
+    return events[:n]
+
+
+def get_week_key(date):
+    start = date - timedelta(days=date.weekday())
+    return start.strftime("%Y-%m-%d")
+
+
+def calculate_points(activities, points=CATEGORIES):
+    total = 0
+    for category, count in activities.items():
+        if category in points:
+            total += points[category] * count
+    return total
+
+
+def build_scores(data):
+    week_order = np.array(sorted(range(len(data.week_keys)), key=data.week_keys.__getitem__), dtype=np.intp)
+    rows = data.index[np.ix_(week_order, np.array(data.roster, dtype=np.intp))]
+    counts = np.zeros((len(week_order), len(data.roster), len(data.categories)), dtype=np.int64)
+    stored = rows >= 0
+    counts[stored] = data.counts[rows[stored]]
+    weeks = [data.week_keys[w] for w in week_order]
+    tables = [data.table_for(week_key) for week_key in weeks]
+    weights = np.array([table["weights"] for table in tables], dtype=np.int64).reshape(len(weeks), len(data.categories))
+    return {
+        "members": list(data.roster),
+        "weeks": weeks,
+        "tables": tables,
+        "counts": counts,
+        "category_points": counts * weights[:, None, :],
+        "points": np.einsum("wmc,wc->wm", counts, weights),
+    }
+
+
+def build_aggregates(data):
+    # Keyed by member id; names resolve through the season's own name table,
+    # so a rename never touches the aggregates.
+    scores = build_scores(data)
+    members, weeks, points = scores["members"], scores["weeks"], scores["points"]
+    agg = {
+        "categories": data.categories,
+        "table_for": data.table_for,
+        "names": data.member_names,
+        "ids": data.member_ids,
+        "totals": dict(zip(members, points.sum(axis=0).tolist())),
+        "category_counts": dict(zip(members, scores["counts"].sum(axis=0))),
+        "category_points": dict(zip(members, scores["category_points"].sum(axis=0))),
+        "member_weeks": {m: {} for m in members},
+        "week_scores": {},
+        "week_tables": dict(zip(weeks, scores["tables"])),
+        "weeks": set(),
+    }
+    for w, i in zip(*np.nonzero(points)):
+        week_key, m = weeks[w], members[i]
+        agg["member_weeks"][m][week_key] = int(points[w, i])
+        agg["week_scores"].setdefault(week_key, {})[m] = int(points[w, i])
+        agg["weeks"].add(week_key)
+    return agg
+
+
+def copy_aggregates(agg, data, edits=None):
+    # A copy bound to data, a copy of the season agg was built from. The
+    # top-level tables are always copied; the per-member arrays and dicts and
+    # the per-week dicts only for the members and weeks the set_points edits
+    # touch, or all of them without edits.
+    copy = {
+        "categories": data.categories,
+        "table_for": data.table_for,
+        "names": data.member_names,
+        "ids": data.member_ids,
+        "totals": dict(agg["totals"]),
+        "category_counts": dict(agg["category_counts"]),
+        "category_points": dict(agg["category_points"]),
+        "member_weeks": dict(agg["member_weeks"]),
+        "week_scores": dict(agg["week_scores"]),
+        "week_tables": dict(agg["week_tables"]),
+        "weeks": set(agg["weeks"]),
+    }
+    if edits is None:
+        members, week_keys = list(copy["totals"]), list(copy["week_scores"])
+    else:
+        # Followed through renames earlier in the batch; members added in it start fresh.
+        ids, members, week_keys = dict(data.member_ids), set(), set()
+        for edit in edits:
+            if edit["op"] == "rename_member" and edit["member"] in ids:
+                ids[edit["new_name"]] = ids.pop(edit["member"])
+            elif edit["op"] == "set_points" and edit["member"] in ids:
+                members.add(ids[edit["member"]])
+                if edit["week"] in copy["week_scores"]:
+                    week_keys.add(edit["week"])
+    for m in members:
+        copy["category_counts"][m] = copy["category_counts"][m].copy()
+        copy["category_points"][m] = copy["category_points"][m].copy()
+        copy["member_weeks"][m] = dict(copy["member_weeks"][m])
+    for week_key in week_keys:
+        copy["week_scores"][week_key] = dict(copy["week_scores"][week_key])
+    return copy
+
+
+def count_vector(categories, activities):
+    return np.array([activities.get(cat, 0) for cat in categories], dtype=np.int64)
+
+
+def apply_edit(data, edit, agg=None):
+    # Guards make replaying an already-compacted log tail harmless.
+    op = edit["op"]
+    if op == "set_points":
+        week_key, member = edit["week"], edit["member"]
+        if member not in data.member_ids:
+            return
+        old = data.get_counts(week_key, member)
+        data.set_counts(week_key, member, edit["counts"])
+        # Edits from check_edits carry the version they create, so replaying one twice is harmless.
+        data.set_version(week_key, member, edit.get("version", data.version(week_key, member) + 1))
+        if agg is not None:
+            update_points(agg, week_key, data.member_ids[member], old, edit["counts"])
+    elif op == "add_member":
+        if edit["member"] not in data.member_ids:
+            data.add_member(edit["member"])
+            if agg is not None:
+                m = data.member_ids[edit["member"]]
+                agg["totals"][m] = 0
+                agg["category_counts"][m] = np.zeros(len(data.categories), dtype=np.int64)
+                agg["category_points"][m] = np.zeros(len(data.categories), dtype=np.int64)
+                agg["member_weeks"][m] = {}
+    elif op == "rename_member":
+        if edit["member"] in data.member_ids and edit["new_name"] not in data.member_ids:
+            data.rename_member(edit["member"], edit["new_name"])
+    elif op == "remove_member":
+        if edit["member"] in data.member_ids:
+            m = data.member_ids[edit["member"]]
+            data.remove_member(edit["member"])
+            if agg is not None:
+                remove_from_aggregates(agg, m)
+    elif op == "set_point_table":
+        data.set_point_table(edit["from"], edit["points"])
+        if agg is not None:
+            rescore_weeks(data, agg)
+    else:
+        raise ValueError(f"Unknown edit: {op}")
+
+
+def update_points(agg, week_key, m, old, new):
+    table = agg["week_tables"].setdefault(week_key, agg["table_for"](week_key))
+    new_counts = count_vector(agg["categories"], new)
+    delta = new_counts - count_vector(agg["categories"], old)
+    agg["category_counts"][m] += delta
+    agg["category_points"][m] += delta * table["weights"]
+    set_week_score(agg, week_key, m, int(new_counts @ table["weights"]))
+
+
+def set_week_score(agg, week_key, m, pts):
+    week_scores = agg["week_scores"].setdefault(week_key, {})
+    agg["totals"][m] += pts - week_scores.get(m, 0)
+    if pts > 0:
+        agg["member_weeks"][m][week_key] = pts
+        week_scores[m] = pts
+        agg["weeks"].add(week_key)
+    else:
+        agg["member_weeks"][m].pop(week_key, None)
+        week_scores.pop(m, None)
+        if not week_scores:
+            del agg["week_scores"][week_key]
+            agg["weeks"].discard(week_key)
+
+
+def rescore_weeks(data, agg):
+    # Each week remembers the table version it was scored with; only weeks whose
+    # applicable table changed are recomputed.
+    roster = np.array(data.roster, dtype=np.intp)
+    for week_key, w in data.week_ids.items():
+        table = data.table_for(week_key)
+        old_table = agg["week_tables"].get(week_key)
+        if old_table is not None and old_table["version"] == table["version"]:
+            continue
+        agg["week_tables"][week_key] = table
+        rows = data.index[w, roster]
+        stored = rows >= 0
+        counts = data.counts[rows[stored]].astype(np.int64)
+        old_weights = table["weights"] if old_table is None else old_table["weights"]
+        for m, member_counts in zip(roster[stored].tolist(), counts):
+            agg["category_points"][m] += member_counts * (table["weights"] - old_weights)
+            set_week_score(agg, week_key, m, int(member_counts @ table["weights"]))
+
+
+def remove_from_aggregates(agg, m):
+    del agg["totals"][m]
+    del agg["category_counts"][m]
+    del agg["category_points"][m]
+    for week_key in agg["member_weeks"].pop(m):
+        del agg["week_scores"][week_key][m]
+        if not agg["week_scores"][week_key]:
+            del agg["week_scores"][week_key]
+            agg["weeks"].discard(week_key)
+
+
+def record_edits(league, data, agg, edits):
+    append_edits(league, edits)
+    for edit in edits:
+        apply_edit(data, edit, agg)
+
+
+@contextmanager
+def locked(league, shared=False):
+    # Serializes writers across processes; readers take it shared so they never
+    # see a compaction half done.
+    with open(league["lock_file"], "a") as f:
+        fcntl.flock(f, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def check_edits(data, edits):
+    # Compare-and-swap per (week, member) cell: a set_points edit carrying the
+    # "base" version its author read applies only if the cell is still at that
+    # version. Accepted edits are stamped with the version they create.
+    accepted, conflicts = [], []
+    for edit in edits:
+        if edit["op"] == "set_points":
+            current = data.version(edit["week"], edit["member"])
+            if edit["member"] not in data.member_ids or edit.get("base", current) != current:
+                conflicts.append(edit)
+                continue
+            edit = {**edit, "version": current + 1}
+        accepted.append(edit)
+    return accepted, conflicts
+
+
+def load_store(league):
+    with locked(league):
+        data = load_data(league)
+        stamp = file_stamp(league)
+    return {
+        "league": league,
+        "data": data,
+        "aggregates": build_aggregates(data),
+        "timeline": None,
+        "snapshots": None,
+        "frames": None,
+        "recent": None,
+        "nbytes": None,
+        "lock": threading.Lock(),
+        "version": 0,
+        "stamp": stamp,
+    }
+
+
+def make_registry(budget=LEAGUE_MEMORY_BUDGET):
+    # Loaded league stores for one process, least recently used first.
+    return {"stores": OrderedDict(), "lock": threading.Lock(), "budget": budget}
+
+
+def open_store(registry, league):
+    # Leagues load on first use and the least recently used are dropped once the
+    # loaded stores pass the registry's budget; the one asked for always stays.
+    with registry["lock"]:
+        stores = registry["stores"]
+        if league["slug"] in stores:
+            stores.move_to_end(league["slug"])
+        else:
+            stores[league["slug"]] = load_store(league)
+        while len(stores) > 1 and sum(store_nbytes(store) for store in stores.values()) > registry["budget"]:
+            stores.popitem(last=False)
+        return stores[league["slug"]]
+
+
+def writable_copies(store, edits):
+    # Writes go to copies that then replace the store's season and aggregates,
+    # so a render still holding the old pair never sees them change under it.
+    # Cell edits copy only the entries they touch, so a save stays O(members + weeks);
+    # removals and point table changes rewrite whole tables and copy everything.
+    ops = {edit["op"] for edit in edits}
+    rewrites = bool(ops & {"remove_member", "set_point_table"})
+    data = store["data"].copy(arrays="remove_member" in ops)
+    return data, copy_aggregates(store["aggregates"], data, None if rewrites else edits)
+
+
+def catch_up(store):
+    # Brings the store level with edits other processes wrote. When only the log
+    # grew, just its new tail is applied; anything else reloads. Call with the
+    # store lock and the league's file lock held.
+    league, old = store["league"], store["stamp"]
+    stamp = file_stamp(league)
+    if stamp == old:
+        return
+    if stamp[0] == old[0] and stamp[2] == old[2] and stamp[1] is not None and (old[1] or (0, 0))[1] <= stamp[1][1]:
+        edits = list(read_log(league["log_file"], old[1][1] if old[1] else 0))
+        data, agg = writable_copies(store, edits)
+        for edit in edits:
+            apply_edit(data, edit, agg)
+            if store["recent"] is not None:
+                store["recent"].appendleft(edit)
+        store["data"], store["aggregates"] = data, agg
+    else:
+        store["data"] = load_data(league)
+        store["aggregates"] = build_aggregates(store["data"])
+        store["recent"] = None
+    store["timeline"] = store["snapshots"] = store["frames"] = None
+    store["version"] += 1
+    store["stamp"] = stamp
+
+
+def sync_store(store):
+    with store["lock"], locked(store["league"], shared=True):
+        catch_up(store)
+
+
+def commit_edits(store, edits, session=None):
+    # Catch up and write under the league's file lock, so concurrent writers in
+    # any process see each other's edits. Edits to different cells all apply;
+    # set_points edits whose cell changed since their base version come back
+    # as conflicts and are not written. Written edits are stamped with the time
+    # and the session that made them, for the history.
+    with store["lock"], locked(store["league"]):
+        catch_up(store)
+        accepted, conflicts = check_edits(store["data"], edits)
+        at = event_time()
+        accepted = [{**edit, "at": at, "session": session} for edit in accepted]
+        if accepted:
+            data, agg = writable_copies(store, accepted)
+            record_edits(store["league"], data, agg, accepted)
+            store["data"], store["aggregates"] = data, agg
+            if store["recent"] is not None:
+                store["recent"].extendleft(accepted)
+            store["timeline"] = store["snapshots"] = store["frames"] = None
+            store["version"] += 1
+            store["stamp"] = file_stamp(store["league"])
+    return conflicts
+
+
+def deep_nbytes(obj):
+    # Rough in-memory size: array and frame buffers plus Python container
+    # overhead. Long containers are sized from their first entry rather than
+    # walked; string keys are shared with the season and not counted.
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage().sum())
+    if isinstance(obj, dict):
+        entries = obj.items()
+    elif isinstance(obj, (list, tuple, set)):
+        entries = zip(itertools.repeat(None), obj)
+    else:
+        return sys.getsizeof(obj)
+    sampled = len(obj) > SIZE_SAMPLE_AFTER
+    size = sum(
+        (deep_nbytes(key) if isinstance(key, tuple) else 0) + deep_nbytes(value)
+        for key, value in itertools.islice(entries, 1 if sampled else None)
+    )
+    return sys.getsizeof(obj) + (size * len(obj) if sampled else size)
+
+
+def store_nbytes(store):
+    # The season, its aggregates and whichever derived caches are built. The
+    # aggregates share their name tables with the season, so those are skipped.
+    # Measured again only when the data or a derived cache changes.
+    with store["lock"]:
+        key = (store["version"], *(id(store[name]) for name in ("data", "aggregates", "timeline", "snapshots", "frames")))
+        if store["nbytes"] is None or store["nbytes"][0] != key:
+            shared = ("categories", "table_for", "names", "ids")
+            size = store["data"].nbytes() + sum(
+                deep_nbytes(value) for name, value in store["aggregates"].items() if name not in shared
+            )
+            size += sum(deep_nbytes(store[name]) for name in ("timeline", "snapshots", "frames") if store[name] is not None)
+            store["nbytes"] = (key, size)
+        return store["nbytes"][1]
+
+
+def iter_activity_rows(data):
+    for week_key in sorted(data.week_keys):
+        w = data.week_ids[week_key]
+        for m in np.flatnonzero(data.index[w] >= 0):
+            counts = data.counts[data.index[w, m]].tolist()
+            for cat, count in zip(data.categories, counts):
+                if count:
+                    yield week_key, data.member_names[m], cat, count
+
+
+def export_csv(data):
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(ACTIVITY_COLUMNS)
+    writer.writerows(iter_activity_rows(data))
+    return buf.getvalue()
+
+
+def export_parquet(data):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([("week", pa.string()), ("member", pa.string()), ("category", pa.string()), ("count", pa.int64())])
+    buf = io.BytesIO()
+    rows = iter_activity_rows(data)
+    with pq.ParquetWriter(buf, schema) as writer:
+        while batch := list(itertools.islice(rows, EXPORT_BATCH_ROWS)):
+            writer.write_table(pa.Table.from_pylist([dict(zip(ACTIVITY_COLUMNS, row)) for row in batch], schema=schema))
+    return buf.getvalue()
+
+
+def read_activity_file(uploaded):
+    if uploaded.name.lower().endswith(".parquet"):
+        return pd.read_parquet(uploaded)
+    return pd.read_csv(uploaded)
+
+
+def plan_import(data, df):
+    # Returns the set_points edits, a per-count diff and the rows that failed validation.
+    missing = [col for col in ACTIVITY_COLUMNS if col not in df.columns]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+    raw = df[ACTIVITY_COLUMNS]
+    df = raw.copy()
+    df["week"] = pd.to_datetime(df["week"], errors="coerce")
+    df["count"] = pd.to_numeric(df["count"], errors="coerce")
+    problems = pd.Series("", index=df.index)
+    problems[(df["count"] < 0) | (df["count"] % 1 != 0) | df["count"].isna()] = "count must be a whole number of 0 or more"
+    problems[~df["category"].isin(data.categories)] = "unknown category"
+    problems[~df["member"].isin(data.members)] = "unknown member"
+    problems[df["week"].isna()] = "unreadable week"
+    errors = raw[problems != ""].assign(error=problems[problems != ""])
+    rows = df[problems == ""].assign(week=lambda d: d["week"].map(get_week_key), count=lambda d: d["count"].astype(int))
+    # Repeated (week, member, category) rows add up, e.g. one CRM row per deal.
+    rows = rows.groupby(["week", "member", "category"])["count"].sum()
+    edits, diff = [], []
+    for (week_key, member), cells in rows.groupby(level=["week", "member"]):
+        old = data.get_counts(week_key, member)
+        new = dict(old)
+        for (_, _, cat), count in cells.items():
+            if old.get(cat, 0) != count:
+                diff.append((week_key, member, cat, old.get(cat, 0), int(count)))
+            new[cat] = int(count)
+        new = sparse_counts(new)
+        if new != old:
+            edits.append({"op": "set_points", "week": week_key, "member": member, "counts": new, "base": data.version(week_key, member)})
+    diff = pd.DataFrame(diff, columns=["week", "member", "category", "old", "new"])
+    return edits, diff, errors
+
+
+def ranked(agg, scores):
+    names = agg["names"]
+    return {names[m]: pts for m, pts in sorted(scores.items(), key=lambda x: x[1], reverse=True)}
+
+
+def get_leaderboard(agg):
+    return ranked(agg, agg["totals"])
+
+
+def get_member_breakdown(agg, member):
+    return dict(zip(agg["categories"], agg["category_counts"][agg["ids"][member]].tolist()))
+
+
+def get_member_category_points(agg, member):
+    return dict(zip(agg["categories"], agg["category_points"][agg["ids"][member]].tolist()))
+
+
+def get_member_weekly_points(agg, member):
+    return dict(sorted(agg["member_weeks"].get(agg["ids"].get(member), {}).items()))
+
+
+def get_weekly_leaderboard(agg, week_key):
+    week_scores = agg["week_scores"].get(week_key, {})
+    return ranked(agg, {m: week_scores.get(m, 0) for m in list(agg["totals"])})
+
+
+def get_all_weeks(timeline):
+    return timeline["active_weeks"][::-1]
+
+
+def week_offset(start, week_key):
+    return (datetime.strptime(week_key, "%Y-%m-%d").date() - start).days // 7
+
+
+def build_timeline(agg):
+    # Cumulative points per member on a contiguous calendar-week axis, so any
+    # range of weeks is one subtraction of two rows: cum[end] - cum[start].
+    weeks = sorted(agg["weeks"])
+    members = list(agg["totals"])
+    if not weeks:
+        return {"start": None, "members": members, "cum": np.zeros((1, len(members)), dtype=np.int64), "active_weeks": []}
+    start = datetime.strptime(weeks[0], "%Y-%m-%d").date()
+    column = {m: i for i, m in enumerate(members)}
+    points = np.zeros((week_offset(start, weeks[-1]) + 2, len(members)), dtype=np.int64)
+    for week_key in weeks:
+        t = week_offset(start, week_key) + 1
+        for m, pts in agg["week_scores"][week_key].items():
+            points[t, column[m]] = pts
+    return {"start": start, "members": members, "cum": np.cumsum(points, axis=0), "active_weeks": weeks}
+
+
+def get_range_leaderboard(agg, timeline, start_date, end_date):
+    # Whole weeks from the one containing start_date through the one containing end_date.
+    cum = timeline["cum"]
+    if timeline["start"] is None:
+        totals = cum[0]
+    else:
+        last = len(cum) - 1
+        lo = min(max(week_offset(timeline["start"], get_week_key(start_date)), 0), last)
+        hi = min(max(week_offset(timeline["start"], get_week_key(end_date)) + 1, 0), last)
+        totals = cum[max(hi, lo)] - cum[lo]
+    return ranked(agg, dict(zip(timeline["members"], totals.tolist())))
+
+
+def get_trailing_leaderboard(agg, timeline, n_weeks, today):
+    return get_range_leaderboard(agg, timeline, today - timedelta(weeks=n_weeks - 1), today)
+
+
+def build_snapshots(timeline):
+    # Cumulative standings materialized at the end of each active week: totals,
+    # ranks and scoring streaks per member. Movement is then read from a row or
+    # two of these instead of re-sorting the history.
+    members, weeks = timeline["members"], timeline["active_weeks"]
+    cum = timeline["cum"]
+    points = np.diff(cum, axis=0)
+    streak = np.zeros(len(members), dtype=np.int64)
+    best = np.zeros(len(members), dtype=np.int64)
+    streaks, best_streaks = np.zeros_like(points), np.zeros_like(points)
+    # Streaks run over calendar weeks, so a week without points breaks them.
+    for t in range(len(points)):
+        streak = (streak + 1) * (points[t] > 0)
+        best = np.maximum(best, streak)
+        streaks[t], best_streaks[t] = streak, best
+    rows = np.array([week_offset(timeline["start"], week_key) for week_key in weeks], dtype=np.intp)
+    totals = cum[rows + 1]
+    # Stable, so ties keep the order get_leaderboard gives them.
+    order = np.argsort(-totals, axis=1, kind="stable")
+    ranks = np.empty_like(order)
+    np.put_along_axis(ranks, order, np.arange(1, len(members) + 1)[None, :].repeat(len(weeks), axis=0), axis=1)
+    return {
+        "weeks": weeks,
+        "members": members,
+        "totals": totals,
+        "week_points": points[rows],
+        "order": order,
+        "ranks": ranks,
+        "streaks": streaks[rows],
+        "best_streaks": best_streaks[rows],
+    }
+
+
+def get_rank_movement(agg, snapshots, week_key=None):
+    # Standings after week_key (default the latest week), with each member's
+    # change in rank since the week before. O(members).
+    weeks = snapshots["weeks"]
+    if not weeks:
+        return {}
+    a = len(weeks) - 1 if week_key is None else bisect.bisect_right(weeks, week_key) - 1
+    if a < 0:
+        return {}
+    names, members = agg["names"], snapshots["members"]
+    ranks = snapshots["ranks"][a]
+    previous = snapshots["ranks"][a - 1] if a > 0 else None
+    movement = {}
+    for i in snapshots["order"][a].tolist():
+        movement[names[members[i]]] = {
+            "rank": int(ranks[i]),
+            "change": None if previous is None else int(previous[i] - ranks[i]),
+            "points": int(snapshots["totals"][a, i]),
+            "week_points": int(snapshots["week_points"][a, i]),
+            "streak": int(snapshots["streaks"][a, i]),
+            "best_streak": int(snapshots["best_streaks"][a, i]),
+        }
+    return movement
+
+
+def get_rank_history(agg, snapshots, members):
+    # Long-form (Week, Member, Rank) rows for a rank-over-time chart.
+    column = {agg["names"][m]: i for i, m in enumerate(snapshots["members"])}
+    return pd.DataFrame(
+        [
+            {"Week": week_key, "Member": name, "Rank": int(snapshots["ranks"][a, column[name]])}
+            for name in members
+            for a, week_key in enumerate(snapshots["weeks"])
+        ],
+        columns=["Week", "Member", "Rank"],
+    )
+
+
+def get_member_weeks(agg, member):
+    return sorted(agg["member_weeks"].get(agg["ids"].get(member), {}), reverse=True)
+
+
+def blocks(keys):
+    # (start, stop) of each run of equal keys in an already grouped sequence.
+    offsets, start = {}, 0
+    for key, run in itertools.groupby(keys):
+        stop = start + sum(1 for _ in run)
+        offsets[key] = (start, stop)
+        start = stop
+    return offsets
+
+
+def build_chart_frames(data, agg):
+    # Tidy chart data for every member at once. Rows are grouped by member (and
+    # week), so one member's chart is frame.iloc[start:stop], a view, not a copy.
+    names, categories = agg["names"], np.array(agg["categories"], dtype=object)
+    members = list(agg["totals"])
+    counts = np.array([agg["category_counts"][m] for m in members]).reshape(len(members), len(categories))
+    points = np.array([agg["category_points"][m] for m in members]).reshape(len(members), len(categories))
+    rows, cols = np.nonzero(counts)
+    member_rows = [names[members[i]] for i in rows]
+    category_frame = pd.DataFrame({"Category": categories[cols], "Points": points[rows, cols]})
+
+    week_rows = [(names[m], week_key, pts) for m in members for week_key, pts in sorted(agg["member_weeks"][m].items())]
+    week_frame = pd.DataFrame([row[1:] for row in week_rows], columns=["Week", "Points"])
+
+    scores = build_scores(data)
+    w, i, c = np.nonzero(scores["counts"])
+    week_category_rows = [(scores["weeks"][a], names[scores["members"][b]]) for a, b in zip(w.tolist(), i.tolist())]
+    week_category_frame = pd.DataFrame({"Category": categories[c], "Points": scores["category_points"][w, i, c]})
+    return {
+        "categories": category_frame,
+        "weeks": week_frame,
+        "week_categories": week_category_frame,
+        "offsets": {
+            "categories": blocks(member_rows),
+            "weeks": blocks(row[0] for row in week_rows),
+            "week_categories": blocks(week_category_rows),
+        },
+    }
+
+
+def chart_slice(frames, name, key):
+    start, stop = frames["offsets"][name].get(key, (0, 0))
+    return frames[name].iloc[start:stop]
+
+
+def file_stamp(league):
+    return tuple(
+        (path.stat().st_mtime_ns, path.stat().st_size) if path.exists() else None
+        for path in (league["data_file"], league["log_file"], league["compacting_file"])
+    )
+
+
+def points_for(obj, points, week_key):
+    # The table Season.table_for would pick, read straight from the JSON form.
+    table = points
+    for entry in obj.get("point_schedule", []):
+        if entry["from"] <= week_key:
+            table = {cat: entry["points"].get(cat, points[cat]) for cat in points}
+    return table
+
+
+def json_leaderboard(obj, points, week_key=None):
+    # Pure-Python scoring for batch use, where importing numpy would cost more
+    # than the whole run. Matches get_leaderboard and get_weekly_leaderboard.
+    scores = {member: 0 for member in obj.get("team_members", [])}
+    for key, week_data in obj.get("weekly_data", {}).items():
+        if week_key is not None and key != week_key:
+            continue
+        table = points_for(obj, points, key)
+        for member, activities in week_data.items():
+            if member in scores:
+                scores[member] += calculate_points(activities, table)
+    return dict(sorted(scores.items(), key=lambda x: x[1], reverse=True))
+
+
+def json_member_breakdown(obj, points, member):
+    breakdown = {cat: {"count": 0, "points": 0} for cat in points}
+    for key, week_data in obj.get("weekly_data", {}).items():
+        table = points_for(obj, points, key)
+        for cat, count in week_data.get(member, {}).items():
+            if cat in breakdown:
+                breakdown[cat]["count"] += count
+                breakdown[cat]["points"] += count * table[cat]
+    return breakdown
+
+
+def write_rows(rows, fmt, out=sys.stdout):
+    if fmt == "csv":
+        writer = csv.DictWriter(out, fieldnames=list(rows[0]) if rows else [])
+        writer.writeheader()
+        writer.writerows(rows)
+    else:
+        json.dump(rows, out, indent=2)
+        out.write("\n")
+
+
+def main(argv=None):
+    import argparse
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--league", default=DEFAULT_LEAGUE)
+    common.add_argument("--format", choices=["json", "csv"], default="json")
+    parser = argparse.ArgumentParser(prog="bradness", description="March Bradness standings without the web app.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("leagues", parents=[common], help="list leagues")
+    standings = commands.add_parser("standings", parents=[common], help="all-time or weekly leaderboard")
+    standings.add_argument("--week", help="any date in the week, YYYY-MM-DD")
+    standings.add_argument("--at", help="standings as of this moment, ISO date and time (local unless it has an offset)")
+    member = commands.add_parser("member", parents=[common], help="activity counts and points by category")
+    member.add_argument("name")
+    history = commands.add_parser("history", parents=[common], help="recent changes, newest first")
+    history.add_argument("-n", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    leagues = list_leagues()
+    if args.command == "leagues":
+        write_rows([{"league": slug, "name": league["name"]} for slug, league in leagues.items()], args.format)
+        return
+    if args.league not in leagues:
+        parser.error(f"no league named '{args.league}'")
+    league = leagues[args.league]
+    # Reads take the league's shared lock like the app and API, so a compaction
+    # can't move the log between reading the snapshot and reading the logs.
+    if args.command == "history":
+        with locked(league, shared=True):
+            events = recent_events(league, args.n)
+        write_rows(
+            [
+                {"at": edit.get("at", ""), "session": edit.get("session") or "", "op": edit["op"], "change": describe_edit(edit)}
+                for edit in events
+            ],
+            args.format,
+        )
+        return
+    if args.command == "standings" and args.at:
+        try:
+            moment = datetime.fromisoformat(args.at).astimezone()
+        except ValueError:
+            parser.error(f"unreadable time '{args.at}'")
+        with locked(league, shared=True):
+            obj = load_json_at(league, moment)[0]
+    else:
+        with locked(league, shared=True):
+            obj = load_json(league)
+    if args.command == "standings":
+        week_key = None
+        if args.week:
+            try:
+                week_key = get_week_key(datetime.strptime(args.week, "%Y-%m-%d"))
+            except ValueError:
+                parser.error(f"unreadable week '{args.week}'")
+        board = json_leaderboard(obj, league["points"], week_key)
+        rows = [{"rank": rank, "member": name, "points": pts} for rank, (name, pts) in enumerate(board.items(), 1)]
+        if week_key:
+            rows = [{"week": week_key, **row} for row in rows]
+        write_rows(rows, args.format)
+    elif args.command == "member":
+        if args.name not in obj.get("team_members", []):
+            parser.error(f"no member named '{args.name}'")
+        breakdown = json_member_breakdown(obj, league["points"], args.name)
+        write_rows([{"category": cat, **cells} for cat, cells in breakdown.items()], args.format)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,15 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import bradness
+
+
+@pytest.fixture
+def league(tmp_path):
+    league = bradness.make_league("test", "Test", bradness.CATEGORIES, tmp_path / "data.json")
+    bradness.write_snapshot(league, {"team_members": ["Ann", "Bo"], "weekly_data": {"2026-03-02": {"Ann": {"CECs": 1}}}})
+    return league
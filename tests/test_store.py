@@ -0,0 +1,139 @@
+from collections import deque
+from datetime import datetime, timezone
+
+import bradness
+
+
+def set_points(week, member, counts, **extra):
+    return {"op": "set_points", "week": week, "member": member, "counts": counts, **extra}
+
+
+def reload(league):
+    store = bradness.load_store(league)
+    return store, bradness.get_leaderboard(store["aggregates"])
+
+
+def test_saving_zeros_on_a_new_week_survives_reload(league):
+    store = bradness.load_store(league)
+    assert not bradness.commit_edits(store, [set_points("2026-03-09", "Ann", {}, base=0)])
+    store, board = reload(league)
+    assert board == {"Ann": 50, "Bo": 0}
+    assert store["data"].version("2026-03-09", "Ann") == 1
+
+
+def test_clearing_a_new_week_survives_reload(league):
+    store = bradness.load_store(league)
+    bradness.commit_edits(store, [set_points("2026-03-09", "Bo", {"Go-Lives": 1}, base=0)])
+    bradness.commit_edits(store, [set_points("2026-03-09", "Bo", {}, base=1)])
+    bradness.compact(league)
+    store, board = reload(league)
+    assert board == {"Ann": 50, "Bo": 0}
+    assert store["data"].version("2026-03-09", "Bo") == 2
+    assert "2026-03-09" not in bradness.read_snapshot(league)["weekly_data"]
+
+
+def test_stale_base_is_a_conflict_and_other_cells_merge(league):
+    first, second = bradness.load_store(league), bradness.load_store(league)
+    assert not bradness.commit_edits(first, [set_points("2026-03-02", "Ann", {"CECs": 2}, base=0)])
+    edits = [set_points("2026-03-02", "Ann", {"CECs": 9}, base=0), set_points("2026-03-02", "Bo", {"CECs": 1}, base=0)]
+    conflicts = bradness.commit_edits(second, edits)
+    assert conflicts == edits[:1]
+    assert bradness.get_leaderboard(second["aggregates"]) == {"Ann": 100, "Bo": 50}
+    assert reload(league)[1] == {"Ann": 100, "Bo": 50}
+
+
+def test_replaying_the_log_twice_is_harmless(league):
+    store = bradness.load_store(league)
+    bradness.commit_edits(store, [set_points("2026-03-02", "Bo", {"Go-Lives": 1}, base=0)])
+    obj = bradness.load_json(league)
+    for edit in bradness.read_log(league["log_file"]):
+        bradness.replay_edit(obj, edit)
+    assert obj["versions"]["2026-03-02"]["Bo"] == 1
+    assert bradness.json_leaderboard(obj, league["points"]) == {"Bo": 160, "Ann": 50}
+
+
+def test_standings_at_a_moment_across_compactions(league, monkeypatch):
+    monkeypatch.setattr(bradness, "COMPACT_BYTES", 300)
+    store = bradness.load_store(league)
+    marks = []
+    for i in range(8):
+        marks.append((datetime.now(timezone.utc), bradness.get_leaderboard(store["aggregates"])))
+        bradness.commit_edits(store, [set_points("2026-03-09", ["Ann", "Bo"][i % 2], {"CECs": i + 1})])
+    marks.append((datetime.now(timezone.utc), bradness.get_leaderboard(store["aggregates"])))
+    assert bradness.history_segments(league)
+    for moment, board in marks:
+        obj, _ = bradness.load_json_at(league, moment)
+        assert bradness.json_leaderboard(obj, league["points"]) == board
+
+
+def test_cached_recent_events_follow_writes_from_both_stores(league):
+    first, second = bradness.load_store(league), bradness.load_store(league)
+    first["recent"] = deque(maxlen=5)
+    for i in range(4):
+        bradness.commit_edits(first, [set_points("2026-03-09", "Ann", {"CECs": i + 1})])
+        bradness.commit_edits(second, [set_points("2026-03-09", "Bo", {"CECs": i + 1})])
+        bradness.sync_store(first)
+    assert list(first["recent"]) == bradness.recent_events(league, 5)
+    bradness.compact(league)
+    bradness.commit_edits(second, [set_points("2026-03-09", "Bo", {})])
+    bradness.sync_store(first)
+    assert first["recent"] is None
+
+
+def test_store_size_counts_derived_caches(league):
+    store = bradness.load_store(league)
+    bare = bradness.store_nbytes(store)
+    assert bare > store["data"].nbytes()
+    store["timeline"] = bradness.build_timeline(store["aggregates"])
+    store["frames"] = bradness.build_chart_frames(store["data"], store["aggregates"])
+    assert bradness.store_nbytes(store) > bare
+
+
+def test_writes_leave_the_season_a_render_holds_untouched(league):
+    store = bradness.load_store(league)
+    data, agg = store["data"], store["aggregates"]
+    bradness.commit_edits(store, [
+        set_points("2026-03-02", "Ann", {}, base=0),
+        set_points("2026-03-09", "Bo", {"CECs": 2}, base=0),
+        {"op": "rename_member", "member": "Bo", "new_name": "Bob"},
+        {"op": "remove_member", "member": "Ann"},
+    ])
+    assert data.get_counts("2026-03-02", "Ann") == {"CECs": 1}
+    assert data.members == ["Ann", "Bo"] and data.size == 1
+    assert bradness.get_leaderboard(agg) == {"Ann": 50, "Bo": 0}
+    assert bradness.get_leaderboard(store["aggregates"]) == {"Bob": 100}
+
+
+def test_registry_drops_the_least_recently_used_league_over_budget(league, tmp_path):
+    other = bradness.make_league("other", "Other", bradness.CATEGORIES, tmp_path / "other.json")
+    bradness.write_snapshot(other, {"team_members": ["Cy"], "weekly_data": {}})
+    registry = bradness.make_registry(budget=1)
+    store = bradness.open_store(registry, league)
+    assert bradness.open_store(registry, league) is store
+    bradness.open_store(registry, other)
+    assert list(registry["stores"]) == ["other"]
+
+
+def test_edits_after_a_torn_log_line_survive(league):
+    store = bradness.load_store(league)
+    bradness.commit_edits(store, [set_points("2026-03-02", "Bo", {"CECs": 1}, base=0)])
+    with open(league["log_file"], "a") as f:
+        f.write('{"op": "set_points", "week": "2026-03-0')
+    bradness.commit_edits(store, [set_points("2026-03-09", "Bo", {"Go-Lives": 1}, base=0)])
+    assert reload(league)[1] == {"Bo": 210, "Ann": 50}
+    bradness.compact(league)
+    assert reload(league)[1] == {"Bo": 210, "Ann": 50}
+
+
+def test_cell_writes_copy_only_what_they_touch(league):
+    store, other = bradness.load_store(league), bradness.load_store(league)
+    data, agg = store["data"], store["aggregates"]
+    ann, bo = agg["ids"]["Ann"], agg["ids"]["Bo"]
+    bradness.commit_edits(other, [{"op": "rename_member", "member": "Ann", "new_name": "Annie"}])
+    bradness.commit_edits(other, [set_points("2026-03-02", "Annie", {"CECs": 3}, base=0)])
+    bradness.sync_store(store)
+    assert data.members == ["Ann", "Bo"]
+    assert bradness.get_leaderboard(agg) == {"Ann": 50, "Bo": 0}
+    assert agg["member_weeks"][ann] == {"2026-03-02": 50}
+    assert bradness.get_leaderboard(store["aggregates"]) == {"Annie": 150, "Bo": 0}
+    assert store["aggregates"]["category_counts"][bo] is agg["category_counts"][bo]